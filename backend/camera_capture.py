@@ -0,0 +1,121 @@
+import cv2
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+class CameraCapture:
+    """Low-latency webcam capture that always hands out the newest frame"""
+    
+    def __init__(self, camera_index: int = 0, width: int = 640, height: int = 480, fps: int = 30, fourcc: str = "MJPG"):
+        self.camera_index = camera_index
+        self.requested = {"width": width, "height": height, "fps": fps, "fourcc": fourcc}
+        self.negotiated = {}
+        self.cap = None
+        self.is_running = False
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        
+        self._frame = None
+        self._timestamp = None
+        self._seq = 0
+        self._read_seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._grabbing = False
+        self._release_on_exit = False
+    
+    def start(self) -> bool:
+        """Open the camera, negotiate format up front and start the grab thread"""
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            print(f"[v0] Camera {self.camera_index} could not be opened")
+            return False
+        
+        # MJPEG lets most USB webcams deliver 640x480@30 without USB bandwidth stalls
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.requested["fourcc"]))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.requested["width"])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.requested["height"])
+        self.cap.set(cv2.CAP_PROP_FPS, self.requested["fps"])
+        # Not every backend honors this; the grab thread keeps us current regardless
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        fourcc = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        self.negotiated = {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": float(self.cap.get(cv2.CAP_PROP_FPS)),
+            "fourcc": "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)),
+        }
+        
+        self.is_running = True
+        self._grabbing = True
+        self._release_on_exit = False
+        self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+        self._thread.start()
+        return True
+    
+    def _grab_loop(self):
+        """Continuously drain the driver buffer, keeping only the latest frame"""
+        while self.is_running:
+            ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+            if not ret:
+                break
+            
+            with self._cond:
+                if self._seq > self._read_seq:
+                    # Previous frame was never consumed
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._timestamp = timestamp
+                self._seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+        
+        with self._cond:
+            self.is_running = False
+            self._grabbing = False
+            release = self._release_on_exit
+            self._cond.notify_all()
+        if release:
+            self._release_device()
+    
+    def read(self, timeout: float = 1.0) -> Tuple[bool, Optional[object], Optional[float]]:
+        """Wait for a frame newer than the last one read; returns (ok, frame, capture time)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._read_seq or not self.is_running, timeout=timeout)
+            if self._seq <= self._read_seq:
+                return False, None, None
+            self._read_seq = self._seq
+            return True, self._frame, self._timestamp
+    
+    @staticmethod
+    def latency_ms(timestamp: float) -> float:
+        """Milliseconds elapsed since a frame was captured"""
+        return (time.monotonic() - timestamp) * 1000
+    
+    def get_stats(self) -> Dict:
+        """Capture statistics including dropped-frame count"""
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            **self.negotiated,
+        }
+    
+    def release(self):
+        """Stop the grab thread and release the device"""
+        self.is_running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        with self._cond:
+            if self._grabbing:
+                # The grab thread is still blocked in read(); releasing the device
+                # under it can crash the driver, so it releases on its way out
+                self._release_on_exit = True
+                return
+        self._release_device()
+    
+    def _release_device(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
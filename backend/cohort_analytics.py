@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+from session_archive import SessionArchive
+from storage import file_lock, file_version, iter_json_array, load_json, save_json
+
+# Per (exercise, week, patient) sums; averages and rates are derived at query time
+AGGREGATE_FIELDS = ("sessions", "rom_sum", "rom_sessions", "completion_sum", "fatigue_sessions", "speed_sum")
+GROUP_BY = ("week", "patient", "exercise")
+
+def week_start(created_at: str) -> str:
+    """Monday of the session's week as YYYY-MM-DD"""
+    day = date.fromisoformat(created_at[:10])
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+def session_values(session: Dict) -> List[float]:
+    rom = session.get("session_summary", {}).get("avg_rom")
+    return [
+        1,
+        rom or 0.0,
+        0 if rom is None else 1,
+        session.get("completion_percentage") or 0.0,
+        1 if session.get("fatigue_detected") else 0,
+        session.get("avg_speed") or 0.0,
+    ]
+
+class CohortAggregates:
+    """Materialized per-exercise, per-week, per-patient session sums for cross-patient analytics
+    
+    Saves fold each new session in under the sessions file lock; rebuild()
+    (run by the cohort_rebuild job or the script, never a request) recomputes
+    everything from the hot file and the archive.
+    Queries run on numpy arrays cached per worker until its data version changes.
+    """
+    
+    def __init__(self, aggregates_file: Path, sessions_file: Path, archive: SessionArchive):
+        self.aggregates_file = aggregates_file
+        self.sessions_file = sessions_file
+        self.archive = archive
+        self.version = None
+        self.arrays = None
+    
+    def _all_sessions(self) -> Iterable[Dict]:
+        return chain(self.archive.iter_sessions(), iter_json_array(self.sessions_file))
+    
+    @staticmethod
+    def compute(sessions: Iterable[Dict]) -> Dict[str, list]:
+        """Aggregate sessions into {"exercise|week|patient": sums} with one vectorized group-by"""
+        exercises, patients, days, values = [], [], [], []
+        seen = set()
+        for session in sessions:
+            created_at = session.get("created_at", "")
+            if len(created_at) < 10 or session.get("id") in seen:
+                continue
+            seen.add(session.get("id"))
+            exercises.append(str(session.get("exercise_id")))
+            patients.append(str(session.get("patient_id")))
+            days.append(created_at[:10])
+            values.append(session_values(session))
+        if not values:
+            return {}
+        
+        days = np.array(days, dtype="datetime64[D]")
+        weeks = (days - (days.astype(np.int64) + 3) % 7).astype(str)  # 1970-01-01 was a Thursday
+        keys = np.char.add(np.char.add(np.char.add(np.char.add(exercises, "|"), weeks), "|"), patients)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        values = np.array(values, dtype=np.float64)
+        sums = np.column_stack([np.bincount(inverse, weights=values[:, i], minlength=len(unique_keys)) for i in range(len(AGGREGATE_FIELDS))])
+        return {key: row for key, row in zip(unique_keys.tolist(), sums.tolist())}
+    
+    def rebuild(self, progress: Optional[Callable[[float, str], None]] = None) -> int:
+        """Recompute from every stored session; saves wait meanwhile so none is missed or counted twice"""
+        with file_lock(self.sessions_file), file_lock(self.aggregates_file):
+            sessions = self._all_sessions()
+            if progress:
+                sessions = self._reporting(sessions, self._session_total(), progress)
+            rows = self.compute(sessions)
+            save_json(self.aggregates_file, {"fields": list(AGGREGATE_FIELDS), "rows": rows}, indent=None)
+        return len(rows)
+    
+    def _session_total(self) -> int:
+        """Cheap estimate of how many sessions a rebuild reads: the count in the
+        stored aggregates, or the archived count when there are none yet"""
+        stored = load_json(self.aggregates_file) if self.aggregates_file.exists() else None
+        if isinstance(stored, dict) and stored.get("rows"):
+            return int(sum(row[0] for row in stored["rows"].values()))
+        return sum(segment["count"] for segment in self.archive.segments())
+    
+    @staticmethod
+    def _reporting(sessions: Iterable[Dict], total: int, progress: Callable[[float, str], None]) -> Iterable[Dict]:
+        for read, session in enumerate(sessions, 1):
+            if read % 1000 == 0:
+                # The total is an estimate, so stay short of done until rebuild returns
+                progress(min(read / max(total, 1), 0.99), f"{read} sessions read")
+            yield session
+    
+    def add_session(self, session: Dict):
+        """Fold in a session being saved; the caller holds the sessions file lock"""
+        if len(session.get("created_at", "")) < 10:
+            return
+        with file_lock(self.aggregates_file):
+            stored = load_json(self.aggregates_file) if self.aggregates_file.exists() else None
+            if not isinstance(stored, dict):
+                # Not built yet (or unreadable): the rebuild job reads every stored
+                # session, this one included, so there is nothing to fold into
+                return
+            rows = stored.get("rows", {})
+            
+            key = f"{session.get('exercise_id')}|{week_start(session['created_at'])}|{session.get('patient_id')}"
+            row = rows.setdefault(key, [0.0] * len(AGGREGATE_FIELDS))
+            for i, value in enumerate(session_values(session)):
+                row[i] += value
+            save_json(self.aggregates_file, {"fields": list(AGGREGATE_FIELDS), "rows": rows}, indent=None)
+    
+    def built(self) -> bool:
+        return self.aggregates_file.exists()
+    
+    def _load(self):
+        """Aggregates as column arrays, re-read only when the file's data version changed
+        
+        Never builds them; that is the cohort_rebuild job's (or the script's) work.
+        """
+        version = file_version(self.aggregates_file)
+        if version == self.version:
+            return self.arrays
+        
+        stored = load_json(self.aggregates_file) if self.aggregates_file.exists() else {}
+        rows = stored.get("rows", {}) if isinstance(stored, dict) else {}
+        parts = [key.split("|") for key in rows]
+        self.arrays = {
+            "exercise": np.array([p[0] for p in parts], dtype=str),
+            "week": np.array([p[1] for p in parts], dtype="datetime64[D]"),
+            "patient": np.array([p[2] for p in parts], dtype=str),
+            "values": np.array(list(rows.values()), dtype=np.float64).reshape(-1, len(AGGREGATE_FIELDS)),
+        }
+        self.version = version
+        return self.arrays
+    
+    def query(self, exercise_id: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+              patient_ids: Optional[List[str]] = None, group_by: str = "week") -> Dict:
+        """Session counts, distinct patients, average ROM/completion/speed and fatigue rate per group
+        
+        start/end (YYYY-MM-DD) select the weeks overlapping [start, end).
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY)}")
+        arrays = self._load()
+        
+        mask = np.ones(len(arrays["week"]), dtype=bool)
+        if exercise_id is not None:
+            mask &= arrays["exercise"] == exercise_id
+        if start:
+            mask &= arrays["week"] > np.datetime64(start[:10], "D") - 7
+        if end:
+            mask &= arrays["week"] < np.datetime64(end[:10], "D")
+        if patient_ids:
+            mask &= np.isin(arrays["patient"], patient_ids)
+        
+        groups, group_index = np.unique(arrays[group_by][mask], return_inverse=True)
+        patients, patient_index = np.unique(arrays["patient"][mask], return_inverse=True)
+        values = arrays["values"][mask]
+        sums = np.column_stack([np.bincount(group_index, weights=values[:, i], minlength=len(groups)) for i in range(len(AGGREGATE_FIELDS))])
+        
+        # Distinct patients per group: count unique (group, patient) pairs
+        pairs = np.unique(group_index.astype(np.int64) * len(patients) + patient_index)
+        patient_counts = np.bincount(pairs // max(len(patients), 1), minlength=len(groups))
+        
+        sessions, rom_sum, rom_sessions, completion_sum, fatigue_sessions, speed_sum = sums.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_rom = np.where(rom_sessions > 0, rom_sum / rom_sessions, np.nan)
+        rows = []
+        for i, group in enumerate(groups.astype(str).tolist()):
+            rows.append({
+                group_by: group,
+                "sessions": int(sessions[i]),
+                "patients": int(patient_counts[i]),
+                "avg_rom": None if np.isnan(avg_rom[i]) else round(float(avg_rom[i]), 1),
+                "avg_completion": round(float(completion_sum[i] / sessions[i]), 1),
+                "fatigue_rate": round(float(fatigue_sessions[i] / sessions[i]), 3),
+                "avg_speed": round(float(speed_sum[i] / sessions[i]), 4),
+            })
+        return {"group_by": group_by, "rows": rows}
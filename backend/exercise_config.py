@@ -0,0 +1,164 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from posture_rules import PostureRules, DEFAULT_POSTURE_RULES
+from storage import file_version
+
+NUM_LANDMARKS = 33
+DEFAULT_DOWN_ANGLE = 120
+DEFAULT_UP_ANGLE = 170
+DEFAULT_TARGET_REPS = 15
+
+class ExerciseDefinition:
+    """Validated, immutable exercise configuration compiled once and shared by every session"""
+    
+    __slots__ = ("exercise_id", "version", "name", "target_reps", "down_angle", "up_angle",
+                 "sides", "joint_names", "joint_triplets", "min_landmarks", "posture_rules")
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("ExerciseDefinition is immutable")
+    
+    def __repr__(self) -> str:
+        return f"ExerciseDefinition(id={self.exercise_id!r}, name={self.name!r}, version={self.version})"
+
+def config_version(exercise: Dict) -> str:
+    """Content hash of an exercise record; changes whenever anything in it changes"""
+    return hashlib.sha1(json.dumps(exercise, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+def _is_number(value) -> bool:
+    # bool is an int subclass, but true/false in a config is always a mistake
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _triplet(value, where: str) -> Tuple[int, int, int]:
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError(f"{where} must be a list of 3 landmark indices")
+    if not all(isinstance(i, int) and _is_number(i) and 0 <= i < NUM_LANDMARKS for i in value):
+        raise ValueError(f"{where} landmark indices must be integers in [0, {NUM_LANDMARKS})")
+    return tuple(value)
+
+def compile_exercise(exercise: Dict) -> ExerciseDefinition:
+    """Validate an exercise record (id, name, target_reps, config_json) and compile it
+    
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(exercise, dict):
+        raise ValueError("Invalid exercise record: must be an object")
+    exercise_id = str(exercise.get("id", ""))
+    try:
+        config = exercise.get("config_json", {})
+        if isinstance(config, str):
+            config = json.loads(config)
+        if not isinstance(config, dict):
+            raise ValueError("config_json must be an object")
+        
+        down_angle = config.get("down_angle", DEFAULT_DOWN_ANGLE)
+        up_angle = config.get("up_angle", DEFAULT_UP_ANGLE)
+        if not all(_is_number(a) and 0 < a <= 180 for a in (down_angle, up_angle)):
+            raise ValueError("down_angle and up_angle must be numbers in (0, 180]")
+        if down_angle >= up_angle:
+            raise ValueError(f"down_angle ({down_angle}) must be below up_angle ({up_angle})")
+        
+        target_reps = exercise.get("target_reps", config.get("target_reps", DEFAULT_TARGET_REPS))
+        if not isinstance(target_reps, int) or not _is_number(target_reps) or target_reps <= 0:
+            raise ValueError("target_reps must be a positive integer")
+        
+        # Every tracked joint is an (a, b, c) landmark triplet; "left"/"right" drive
+        # rep counting, "secondary" joints are only reported
+        keypoints = config.get("keypoints", {})
+        if not isinstance(keypoints, dict):
+            raise ValueError("keypoints must be an object")
+        sides = tuple(side for side in ("left", "right") if side in keypoints)
+        triplets = [_triplet(keypoints[side], f"keypoints.{side}") for side in sides]
+        if not sides:
+            sides = ("right",)
+            triplets = [(0, 1, 2)]
+        secondary = keypoints.get("secondary", {})
+        if not isinstance(secondary, dict):
+            raise ValueError("keypoints.secondary must be an object of name: triplet")
+        triplets += [_triplet(t, f"keypoints.secondary.{name}") for name, t in secondary.items()]
+        joint_triplets = np.array(triplets, dtype=np.intp)
+        joint_triplets.setflags(write=False)
+        
+        posture_rules = PostureRules(config.get("posture_rules", DEFAULT_POSTURE_RULES))
+    except (ValueError, TypeError, KeyError) as e:
+        label = exercise_id or exercise.get("name") or "?"
+        raise ValueError(f"Invalid configuration for exercise {label}: {e}") from None
+    
+    return ExerciseDefinition(
+        exercise_id=exercise_id,
+        version=config_version(exercise),
+        name=exercise.get("name", ""),
+        target_reps=target_reps,
+        down_angle=float(down_angle),
+        up_angle=float(up_angle),
+        sides=sides,
+        joint_names=sides + tuple(secondary),
+        joint_triplets=joint_triplets,
+        min_landmarks=int(joint_triplets.max()) + 1,
+        posture_rules=posture_rules,
+    )
+
+def compile_config(config: Dict, exercise_id: str = "") -> ExerciseDefinition:
+    """Compile a bare config_json dict (no library record around it)"""
+    return compile_exercise({"id": exercise_id, "config_json": config})
+
+class ExerciseLibrary:
+    """Compiled exercise definitions cached by id and content version
+    
+    load() recompiles only records whose content changed, so sessions keep
+    sharing the same definition objects. With a file, get() reloads it when
+    it changes on disk. Invalid records are kept out of the library and their
+    errors reported in `errors`.
+    """
+    
+    def __init__(self, exercises_file: Optional[Path] = None):
+        self.exercises_file = exercises_file
+        self.file_version = None
+        self.definitions = {}
+        self.errors = {}
+    
+    def load(self, exercises: List[Dict]):
+        definitions = {}
+        errors = {}
+        for exercise in exercises:
+            exercise_id = str(exercise.get("id", "")) if isinstance(exercise, dict) else ""
+            cached = self.definitions.get(exercise_id)
+            if cached is not None and cached.version == config_version(exercise):
+                definitions[exercise_id] = cached
+                continue
+            try:
+                definitions[exercise_id] = compile_exercise(exercise)
+            except ValueError as e:
+                errors[exercise_id] = str(e)
+                print(f"[v0] {e}")
+        self.definitions = definitions
+        self.errors = errors
+    
+    def refresh(self):
+        """Reload the exercises file if it changed since the last load"""
+        if self.exercises_file is None:
+            return
+        version = file_version(self.exercises_file)
+        if version == self.file_version:
+            return
+        
+        exercises = []
+        if self.exercises_file.exists():
+            with open(self.exercises_file, 'r') as f:
+                exercises = json.load(f)
+        self.load(exercises)
+        self.file_version = version
+    
+    def get(self, exercise_id) -> ExerciseDefinition:
+        """Compiled definition for exercise_id; KeyError if unknown, ValueError if its config is invalid"""
+        self.refresh()
+        exercise_id = str(exercise_id)
+        if exercise_id in self.errors:
+            raise ValueError(self.errors[exercise_id])
+        return self.definitions[exercise_id]
@@ -1,156 +1,221 @@
-import json
-from typing import Dict, List, Tuple
-import numpy as np
-from pose_detector import PoseDetector
-
-class ExerciseEngine:
-    """Handles exercise logic with posture detection and rep counting"""
-    
-    def __init__(self, exercise_config: Dict):
-        self.config = exercise_config
-        self.rep_count = 0
-        self.state = "down"
-        self.landmarks_history = []
-        self.rom_values = []
-        self.speeds = []
-        self.detector = PoseDetector()
-        self.frame_count = 0
-        self.last_rep_time = 0
-        
-        self.coco_points = {
-            "nose": 0,
-            "left_shoulder": 11,
-            "right_shoulder": 12,
-            "left_elbow": 13,
-            "right_elbow": 14,
-            "left_wrist": 15,
-            "right_wrist": 16,
-            "left_hip": 23,
-            "right_hip": 24,
-            "left_knee": 25,
-            "right_knee": 26,
-            "left_ankle": 27,
-            "right_ankle": 28,
-        }
-    
-    def process_frame(self, frame, results) -> Tuple[Dict, List]:
-        """Process frame and return metrics + posture errors"""
-        landmarks = self.detector.get_landmarks(results)
-        posture_errors = []
-        
-        if not landmarks:
-            return self._get_metrics(), posture_errors
-        
-        self.landmarks_history.append(landmarks)
-        if len(self.landmarks_history) > 100:
-            self.landmarks_history.pop(0)
-        
-        self.frame_count += 1
-        
-        keypoints = self.config.get("keypoints", {}).get("right", [0, 1, 2])
-        if len(keypoints) == 3 and len(landmarks) > max(keypoints):
-            p1 = (landmarks[keypoints[0]][0], landmarks[keypoints[0]][1])
-            p2 = (landmarks[keypoints[1]][0], landmarks[keypoints[1]][1])
-            p3 = (landmarks[keypoints[2]][0], landmarks[keypoints[2]][1])
-            
-            angle = self.detector.calculate_angle(p1, p2, p3)
-            self.rom_values.append(angle)
-            
-            down_threshold = self.config.get("down_angle", 120)
-            up_threshold = self.config.get("up_angle", 170)
-            
-            if self.state == "down" and angle > up_threshold:
-                self.state = "up"
-                self.rep_count += 1
-                self.last_rep_time = self.frame_count
-            elif self.state == "up" and angle < down_threshold:
-                self.state = "down"
-        
-        if len(self.landmarks_history) >= 5:
-            diffs = []
-            for i in range(len(self.landmarks_history) - 1):
-                diff = np.linalg.norm(np.array(self.landmarks_history[i]) - np.array(self.landmarks_history[i+1]))
-                diffs.append(diff)
-            if diffs:
-                speed = np.mean(diffs)
-                self.speeds.append(speed)
-        
-        posture_errors = self._check_posture(landmarks)
-        
-        return self._get_metrics(), posture_errors
-    
-    def _check_posture(self, landmarks: List) -> List[str]:
-        """Check posture based on COCO keypoint positions"""
-        errors = []
-        
-        if len(landmarks) < 29:
-            return errors
-        
-        # Check if shoulders are level (y-coordinate should be similar)
-        left_shoulder = landmarks[self.coco_points["left_shoulder"]]
-        right_shoulder = landmarks[self.coco_points["right_shoulder"]]
-        shoulder_diff = abs(left_shoulder[1] - right_shoulder[1])
-        if shoulder_diff > 0.1:  # Significant height difference
-            errors.append("shoulders_uneven")
-        
-        # Check if back is straight (nose over hips)
-        nose = landmarks[self.coco_points["nose"]]
-        left_hip = landmarks[self.coco_points["left_hip"]]
-        right_hip = landmarks[self.coco_points["right_hip"]]
-        hip_center_x = (left_hip[0] + right_hip[0]) / 2
-        if abs(nose[0] - hip_center_x) > 0.15:
-            errors.append("back_not_straight")
-        
-        # Check hip alignment
-        hip_diff = abs(left_hip[1] - right_hip[1])
-        if hip_diff > 0.1:
-            errors.append("hip_misaligned")
-        
-        # Check knee alignment (for lower body exercises)
-        left_knee = landmarks[self.coco_points["left_knee"]]
-        right_knee = landmarks[self.coco_points["right_knee"]]
-        knee_y_diff = abs(left_knee[1] - right_knee[1])
-        if knee_y_diff > 0.12:
-            errors.append("knee_not_aligned")
-        
-        # Check neck position (nose should be forward, not tilted down)
-        if nose[1] < 0.1:  # Head too far back
-            errors.append("neck_position")
-        
-        return errors
-    
-    def _get_metrics(self) -> Dict:
-        """Calculate current session metrics"""
-        avg_rom = np.mean(self.rom_values) if self.rom_values else 0
-        rom_reduction = self._calculate_rom_reduction()
-        avg_speed = np.mean(self.speeds) if self.speeds else 0
-        fatigue = rom_reduction > 15 or avg_speed < 0.01
-        
-        return {
-            "reps": self.rep_count,
-            "avg_rom": float(avg_rom),
-            "avg_speed": float(avg_speed),
-            "fatigue_detected": fatigue,
-            "rom_reduction": float(rom_reduction),
-            "frame_count": self.frame_count
-        }
-    
-    def _calculate_rom_reduction(self) -> float:
-        """Detect fatigue by ROM reduction"""
-        if len(self.rom_values) < 20:
-            return 0
-        
-        first_half = np.mean(self.rom_values[:len(self.rom_values)//2])
-        second_half = np.mean(self.rom_values[len(self.rom_values)//2:])
-        
-        reduction = ((first_half - second_half) / first_half * 100) if first_half > 0 else 0
-        return max(0, reduction)
-    
-    def reset(self):
-        """Reset session state"""
-        self.rep_count = 0
-        self.state = "down"
-        self.landmarks_history = []
-        self.rom_values = []
-        self.speeds = []
-        self.frame_count = 0
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from exercise_config import ExerciseDefinition, compile_config
+from pose_detector import PoseDetector
+
+class ExerciseEngine:
+    """Handles exercise logic with posture detection and rep counting"""
+    
+    def __init__(self, exercise: Union[ExerciseDefinition, Dict]):
+        # A bare config dict is compiled here; sessions normally share a
+        # definition from an ExerciseLibrary
+        if not isinstance(exercise, ExerciseDefinition):
+            exercise = compile_config(exercise)
+        self.exercise = exercise
+        self.rep_count = 0
+        self.state = "down"
+        self.frame_count = 0
+        self.last_rep_time = 0
+        self._reset_running_stats()
+        self.posture_rules = exercise.posture_rules
+        
+        self.sides = list(exercise.sides)
+        self.joint_names = list(exercise.joint_names)
+        self.joint_triplets = exercise.joint_triplets
+        self.min_landmarks = exercise.min_landmarks
+        
+        self.down_threshold = exercise.down_angle
+        self.up_threshold = exercise.up_angle
+        self.side_up = np.zeros(len(self.sides), dtype=bool)
+        self.side_reps = np.zeros(len(self.sides), dtype=int)
+        self.side_angles = [0.0] * len(self.sides)
+        self.joint_angles = {}
+        self.asymmetry_sum = 0.0
+        self.asymmetry_frames = 0
+    
+    def _reset_running_stats(self):
+        """Running sums and per-rep state; nothing here grows per frame"""
+        self.previous_points = None
+        self.frame_diffs = deque(maxlen=99)  # speed window of the last 100 frames
+        self.frame_diff_sum = 0.0
+        self.rom_sum = 0.0
+        self.rom_frames = 0
+        self.speed_sum = 0.0
+        self.speed_frames = 0
+        self.current_angle = 0.0
+        self.current_speed = 0.0
+        self.rep_records = []
+        self.rom_reduction = 0.0
+        self.timestamp = None
+        self._start_rep_segment()
+    
+    def _start_rep_segment(self):
+        """Begin accumulating the next rep at the current frame"""
+        self.segment_start_frame = self.frame_count
+        self.segment_start_time = self.timestamp
+        self.segment_start_reps = self.rep_count
+        self.segment_peak = -np.inf
+        self.segment_trough = np.inf
+        self.segment_posture = {}
+    
+    def process_frame(self, frame, results, timestamp: Optional[float] = None) -> Tuple[Dict, List]:
+        """Process frame and return metrics + posture errors"""
+        landmarks = PoseDetector.get_landmarks(results)
+        return self.process_landmarks(landmarks, timestamp)
+    
+    def process_landmarks(self, landmarks: List, timestamp: Optional[float] = None) -> Tuple[Dict, List]:
+        """Process (x, y, visibility) landmarks and return metrics + posture errors"""
+        posture_errors = []
+        
+        if not landmarks:
+            return self._get_metrics(), posture_errors
+        
+        self.frame_count += 1
+        self.timestamp = timestamp
+        if self.segment_start_time is None:
+            self.segment_start_time = timestamp
+        points = np.asarray(landmarks, dtype=np.float64)
+        
+        if len(landmarks) >= self.min_landmarks:
+            self._update_joints(points)
+        
+        self._update_speed(points)
+        
+        posture_errors = self._check_posture(landmarks)
+        for error in posture_errors:
+            self.segment_posture[error] = self.segment_posture.get(error, 0) + 1
+        
+        return self._get_metrics(), posture_errors
+    
+    def _update_speed(self, points: np.ndarray):
+        """Mean landmark displacement over a sliding window, updated incrementally"""
+        if self.previous_points is not None and self.previous_points.shape == points.shape:
+            if len(self.frame_diffs) == self.frame_diffs.maxlen:
+                self.frame_diff_sum -= self.frame_diffs[0]
+            diff = float(np.linalg.norm(points - self.previous_points))
+            self.frame_diffs.append(diff)
+            self.frame_diff_sum += diff
+        self.previous_points = points
+        
+        if len(self.frame_diffs) >= 4:
+            self.current_speed = self.frame_diff_sum / len(self.frame_diffs)
+            self.speed_sum += self.current_speed
+            self.speed_frames += 1
+    
+    def _update_joints(self, points: np.ndarray):
+        """Compute all joint angles in one pass and advance each side's rep state machine"""
+        angles = PoseDetector.calculate_angles(points[:, :2], self.joint_triplets)
+        self.joint_angles = dict(zip(self.joint_names, angles.tolist()))
+        
+        side_angles = angles[:len(self.sides)]
+        self.side_angles = side_angles.tolist()
+        self.current_angle = float(side_angles.mean())
+        self.rom_sum += self.current_angle
+        self.rom_frames += 1
+        self.segment_peak = max(self.segment_peak, self.current_angle)
+        self.segment_trough = min(self.segment_trough, self.current_angle)
+        
+        previous_state = self.state
+        went_up = ~self.side_up & (side_angles > self.up_threshold)
+        went_down = self.side_up & (side_angles < self.down_threshold)
+        self.side_reps += went_up
+        self.side_up = (self.side_up | went_up) & ~went_down
+        
+        # Either side completing a rep counts, so a mirrored camera or a
+        # one-sided exercise still scores
+        rep_count = int(self.side_reps.max())
+        if rep_count > self.rep_count:
+            self.rep_count = rep_count
+            self.last_rep_time = self.frame_count
+        self.state = "up" if self.side_up.any() else "down"
+        
+        # A rep is the segment between two returns to the down position
+        if previous_state == "up" and self.state == "down":
+            self._close_rep_segment()
+        
+        if len(self.sides) == 2:
+            visibility = points[self.joint_triplets[:2], 2]
+            if visibility.min() >= 0.5:
+                self.asymmetry_sum += abs(side_angles[0] - side_angles[1])
+                self.asymmetry_frames += 1
+    
+    def _close_rep_segment(self):
+        """Emit a record for the rep that just finished and start the next one"""
+        if self.rep_count > self.segment_start_reps:
+            tempo = None
+            if self.timestamp is not None and self.segment_start_time is not None:
+                tempo = self.timestamp - self.segment_start_time
+            
+            self.rep_records.append({
+                "rep": self.rep_count,
+                "start_frame": self.segment_start_frame,
+                "end_frame": self.frame_count,
+                "counted_frame": self.last_rep_time,
+                "peak_angle": self.segment_peak,
+                "trough_angle": self.segment_trough,
+                "rom": self.segment_peak - self.segment_trough,
+                "tempo_frames": self.frame_count - self.segment_start_frame,
+                "tempo_seconds": tempo,
+                "posture_errors": self.segment_posture,
+            })
+            self.rom_reduction = self._calculate_rom_reduction()
+        
+        self._start_rep_segment()
+    
+    def _check_posture(self, landmarks: List) -> List[str]:
+        """Check posture against the exercise's compiled posture rules"""
+        return self.posture_rules.evaluate(landmarks)
+    
+    def _get_metrics(self) -> Dict:
+        """Calculate current session metrics"""
+        avg_rom = self.rom_sum / self.rom_frames if self.rom_frames else 0
+        rom_reduction = self.rom_reduction
+        avg_speed = self.speed_sum / self.speed_frames if self.speed_frames else 0
+        fatigue = rom_reduction > 15 or avg_speed < 0.01
+        asymmetry = self.asymmetry_sum / self.asymmetry_frames if self.asymmetry_frames else 0
+        side_reps = dict(zip(self.sides, self.side_reps.tolist()))
+        
+        return {
+            "reps": self.rep_count,
+            "avg_rom": float(avg_rom),
+            "avg_speed": float(avg_speed),
+            "fatigue_detected": bool(fatigue),
+            "rom_reduction": float(rom_reduction),
+            "frame_count": self.frame_count,
+            "angle": self.current_angle,
+            "speed": self.current_speed,
+            "last_rep": self.rep_records[-1] if self.rep_records else None,
+            "side_reps": side_reps,
+            "rep_asymmetry": max(side_reps.values()) - min(side_reps.values()),
+            "angle_asymmetry": float(asymmetry),
+            "side_angles": self.side_angles,
+            "joint_angles": self.joint_angles
+        }
+    
+    def _calculate_rom_reduction(self) -> float:
+        """Detect fatigue by per-rep ROM reduction, early reps vs recent reps"""
+        if len(self.rep_records) < 4:
+            return 0
+        
+        roms = np.array([r["rom"] for r in self.rep_records])
+        first_half = np.mean(roms[:len(roms)//2])
+        second_half = np.mean(roms[len(roms)//2:])
+        
+        reduction = ((first_half - second_half) / first_half * 100) if first_half > 0 else 0
+        return max(0, reduction)
+    
+    def reset(self):
+        """Reset session state"""
+        self.rep_count = 0
+        self.state = "down"
+        self.frame_count = 0
+        self.last_rep_time = 0
+        self._reset_running_stats()
+        self.side_up[:] = False
+        self.side_reps[:] = 0
+        self.side_angles = [0.0] * len(self.sides)
+        self.joint_angles = {}
+        self.asymmetry_sum = 0.0
+        self.asymmetry_frames = 0
@@ -0,0 +1,225 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from storage import IdAllocator, load_json, update_json
+
+JOB_STATES = ("queued", "running", "succeeded", "failed")
+
+class JobContext:
+    """Handed to a job handler: its id and params, plus progress reporting"""
+    
+    def __init__(self, queue: "JobQueue", job: Dict):
+        self.queue = queue
+        self.job_id = job["id"]
+        self.params = job.get("params", {})
+        self.last_report = 0.0
+    
+    def progress(self, fraction: float, message: str = "", force: bool = False):
+        """Record progress in [0, 1]; writes are throttled so tight loops can call this freely"""
+        now = time.monotonic()
+        if not force and now - self.last_report < self.queue.progress_interval:
+            return
+        self.last_report = now
+        self.queue._update(self.job_id, progress=round(min(max(fraction, 0.0), 1.0), 4), message=message)
+
+class JobQueue:
+    """In-process background jobs backed by a persistent JSON job table
+    
+    Handlers are registered per job kind and run on a pool of worker threads,
+    off the request path. Every worker process polls the same table and claims
+    queued jobs under its lock, so with several uvicorn workers a job runs
+    exactly once. Running jobs heartbeat; one whose owner stopped heartbeating
+    (process killed, machine restarted) is put back in the queue.
+    """
+    
+    def __init__(self, jobs_file: Path, ids: IdAllocator, workers: int = 2, poll_interval: float = 1.0,
+                 progress_interval: float = 0.5, stale_after: float = 60.0, keep_days: int = 7, max_attempts: int = 3):
+        self.jobs_file = jobs_file
+        self.ids = ids
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+        self.keep_days = keep_days
+        self.max_attempts = max_attempts
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.handlers: Dict[str, Callable[[JobContext], Optional[Dict]]] = {}
+        self.expire_hooks: Dict[str, Callable[[Dict], None]] = {}
+        self.running = set()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.threads = []
+    
+    def register(self, kind: str, handler: Callable[[JobContext], Optional[Dict]],
+                 on_expire: Optional[Callable[[Dict], None]] = None):
+        """handler(ctx) does the work and returns a JSON-serializable result; raising marks the job failed
+        
+        on_expire(job) runs once a finished job is dropped after keep_days, to
+        delete anything the job left behind (export files, say).
+        """
+        self.handlers[kind] = handler
+        if on_expire is not None:
+            self.expire_hooks[kind] = on_expire
+    
+    def submit(self, kind: str, params: Optional[Dict] = None) -> Dict:
+        """Queue a job, or return the identical queued/running one instead of doing the work twice"""
+        if kind not in self.handlers:
+            raise KeyError(kind)
+        params = params or {}
+        with update_json(self.jobs_file) as jobs:
+            for job in jobs.values():
+                if job["kind"] == kind and job["params"] == params and job["status"] in ("queued", "running"):
+                    return dict(job)
+            
+            job_id = self.ids.next("jobs", jobs.keys())
+            job = {
+                "id": job_id,
+                "kind": kind,
+                "params": params,
+                "status": "queued",
+                "progress": 0.0,
+                "message": "",
+                "result": None,
+                "error": None,
+                "attempts": 0,
+                "owner": None,
+                "created_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "heartbeat_at": None,
+            }
+            jobs[job_id] = job
+        self.wakeup.set()
+        return dict(job)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        return load_json(self.jobs_file).get(str(job_id))
+    
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Most recent jobs first"""
+        jobs = [j for j in load_json(self.jobs_file).values()
+                if (kind is None or j["kind"] == kind) and (status is None or j["status"] == status)]
+        jobs.sort(key=lambda j: j["created_at"], reverse=True)
+        return jobs[:limit]
+    
+    def start(self):
+        """Start the worker threads and the heartbeat"""
+        if self.threads:
+            return
+        self.stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        thread.start()
+        self.threads.append(thread)
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming jobs; running handlers finish unless the process exits first"""
+        self.stopping.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+    
+    def _claim(self) -> Optional[Dict]:
+        """Take the oldest queued job this process can run, recovering stale ones along the way"""
+        now = datetime.now()
+        stale_before = (now - timedelta(seconds=self.stale_after)).isoformat()
+        expire_before = (now - timedelta(days=self.keep_days)).isoformat()
+        # Idle workers poll every second in every process; peek without the
+        # lock and only rewrite the table when there is something to change
+        if not any(self._needs_claim(job, stale_before, expire_before) for job in load_json(self.jobs_file).values()):
+            return None
+        expired = []
+        with update_json(self.jobs_file) as jobs:
+            for job_id, job in list(jobs.items()):
+                if job["status"] == "running" and (job["heartbeat_at"] or "") < stale_before:
+                    job.update(status="queued", owner=None, message="requeued after its worker stopped responding")
+                elif job["status"] in ("succeeded", "failed") and (job["finished_at"] or "") < expire_before:
+                    expired.append(jobs.pop(job_id))
+            job = self._start_next(jobs, now)
+        # Outside the lock, once the table without them is saved, so each runs once
+        self._expire(expired)
+        return job
+    
+    def _start_next(self, jobs: Dict, now: datetime) -> Optional[Dict]:
+        """Mark the oldest runnable queued job as running by this process; the caller holds the lock"""
+        queued = [j for j in jobs.values() if j["status"] == "queued" and j["kind"] in self.handlers]
+        if not queued:
+            return None
+        job = min(queued, key=lambda j: j["created_at"])
+        job["attempts"] += 1
+        if job["attempts"] > self.max_attempts:
+            job.update(status="failed", error=f"gave up after {self.max_attempts} attempts", finished_at=now.isoformat())
+            return None
+        job.update(status="running", owner=self.owner, started_at=now.isoformat(), heartbeat_at=now.isoformat())
+        self.running.add(job["id"])
+        return dict(job)
+    
+    def _expire(self, expired: List[Dict]):
+        for job in expired:
+            hook = self.expire_hooks.get(job["kind"])
+            if hook is None:
+                continue
+            try:
+                hook(job)
+            except Exception as e:
+                print(f"[v0] Job {job['id']} ({job['kind']}) cleanup error: {e}")
+    
+    def _needs_claim(self, job: Dict, stale_before: str, expire_before: str) -> bool:
+        """Whether _claim has work to do for this job: run it, requeue it or expire it"""
+        if job["status"] == "queued":
+            return job["kind"] in self.handlers
+        if job["status"] == "running":
+            return (job["heartbeat_at"] or "") < stale_before
+        return (job["finished_at"] or "") < expire_before
+    
+    def _update(self, job_id: str, **fields):
+        with update_json(self.jobs_file) as jobs:
+            if job_id in jobs:
+                jobs[job_id].update(fields)
+    
+    def _run(self, job: Dict):
+        context = JobContext(self, job)
+        try:
+            result = self.handlers[job["kind"]](context)
+            self._update(job["id"], status="succeeded", progress=1.0, result=result, finished_at=datetime.now().isoformat())
+        except Exception as e:
+            print(f"[v0] Job {job['id']} ({job['kind']}) error: {e}")
+            self._update(job["id"], status="failed", error=f"{type(e).__name__}: {e}",
+                         traceback=traceback.format_exc(limit=5), finished_at=datetime.now().isoformat())
+        finally:
+            self.running.discard(job["id"])
+    
+    def _work_loop(self):
+        while not self.stopping.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"[v0] Job queue error: {e}")
+                job = None
+            if job is None:
+                # Other processes submit too, so poll as well as waiting for a local wakeup
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+                continue
+            self._run(job)
+    
+    def _heartbeat_loop(self):
+        interval = self.stale_after / 4
+        while not self.stopping.wait(interval):
+            running = list(self.running)
+            if not running:
+                continue
+            now = datetime.now().isoformat()
+            with update_json(self.jobs_file) as jobs:
+                for job_id in running:
+                    if job_id in jobs and jobs[job_id]["owner"] == self.owner:
+                        jobs[job_id]["heartbeat_at"] = now
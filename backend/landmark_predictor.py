@@ -0,0 +1,54 @@
+import numpy as np
+from typing import List, Optional
+
+class LandmarkPredictor:
+    """Constant-velocity (alpha-beta) predictor over all pose landmarks at once"""
+    
+    def __init__(self, alpha: float = 0.85, beta: float = 0.3, max_horizon: float = 0.15, min_visibility: float = 0.5):
+        self.alpha = alpha
+        self.beta = beta
+        self.max_horizon = max_horizon  # seconds; beyond this extrapolation overshoots
+        self.min_visibility = min_visibility
+        self.reset()
+    
+    def reset(self):
+        """Forget all motion state"""
+        self.position = None  # (N, 2) filtered x, y
+        self.velocity = None  # (N, 2) normalized units per second
+        self.visibility = None  # (N,)
+        self.last_time = None
+    
+    def update(self, landmarks: List, timestamp: float):
+        """Feed a fresh inference result of (x, y, visibility) landmarks"""
+        if not landmarks:
+            self.reset()
+            return
+        
+        points = np.asarray(landmarks, dtype=np.float64)
+        xy, visibility = points[:, :2], points[:, 2]
+        
+        if self.position is None or self.position.shape != xy.shape:
+            self.position = xy.copy()
+            self.velocity = np.zeros_like(xy)
+        else:
+            dt = timestamp - self.last_time
+            if dt <= 0:
+                return
+            predicted = self.position + self.velocity * dt
+            residual = xy - predicted
+            self.position = predicted + self.alpha * residual
+            self.velocity = self.velocity + (self.beta / dt) * residual
+            # Occluded points jitter; don't let them fling the skeleton around
+            self.velocity[visibility < self.min_visibility] = 0
+        
+        self.visibility = visibility
+        self.last_time = timestamp
+    
+    def predict(self, timestamp: float) -> Optional[np.ndarray]:
+        """Landmarks extrapolated to timestamp as an (N, 3) array, or None"""
+        if self.position is None:
+            return None
+        
+        dt = np.clip(timestamp - self.last_time, 0, self.max_horizon)
+        xy = self.position + self.velocity * dt
+        return np.column_stack((xy, self.visibility))
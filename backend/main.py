@@ -1,147 +1,660 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from datetime import datetime
-import json
-import os
-from pathlib import Path
-
-app = FastAPI(title="CATS - Clinical AI Training System")
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# JSON Storage paths
-DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
-USERS_FILE = DATA_DIR / "users.json"
-EXERCISES_FILE = DATA_DIR / "exercises.json"
-SESSIONS_FILE = DATA_DIR / "sessions.json"
-
-def load_json(file_path: Path) -> dict | list:
-    """Load JSON file, create if not exists"""
-    if not file_path.exists():
-        return {} if file_path.name == "users.json" else []
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except:
-        return {} if file_path.name == "users.json" else []
-
-def save_json(file_path: Path, data):
-    """Save data to JSON file"""
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
-
-# Pydantic models
-class UserCreate(BaseModel):
-    email: str
-    password: str
-    name: str
-    role: str
-
-class SessionData(BaseModel):
-    patient_id: str
-    exercise_id: str
-    completion_percentage: float
-    avg_speed: float
-    fatigue_detected: bool
-    form_errors: int
-    session_summary: dict
-
-class ExerciseConfig(BaseModel):
-    name: str
-    category: str
-    description: str
-    target_reps: int
-    config_json: dict
-
-# Routes
-@app.post("/auth/register")
-def register(user: UserCreate):
-    users = load_json(USERS_FILE)
-    
-    if user.email in users:
-        raise HTTPException(status_code=400, detail="Email already exists")
-    
-    user_id = str(len(users) + 1)
-    users[user.email] = {
-        "id": user_id,
-        "email": user.email,
-        "password": user.password,
-        "name": user.name,
-        "role": user.role,
-        "created_at": datetime.now().isoformat()
-    }
-    save_json(USERS_FILE, users)
-    return {"message": "User created", "email": user.email, "id": user_id}
-
-@app.post("/auth/login")
-def login(email: str, password: str):
-    users = load_json(USERS_FILE)
-    
-    if email not in users or users[email]["password"] != password:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    user = users[email]
-    return {"id": user["id"], "name": user["name"], "role": user["role"]}
-
-@app.post("/sessions/save")
-def save_session(session_data: SessionData):
-    sessions = load_json(SESSIONS_FILE)
-    
-    session_id = str(len(sessions) + 1)
-    sessions.append({
-        "id": session_id,
-        "patient_id": session_data.patient_id,
-        "exercise_id": session_data.exercise_id,
-        "completion_percentage": session_data.completion_percentage,
-        "avg_speed": session_data.avg_speed,
-        "fatigue_detected": session_data.fatigue_detected,
-        "form_errors": session_data.form_errors,
-        "session_summary": session_data.session_summary,
-        "created_at": datetime.now().isoformat()
-    })
-    save_json(SESSIONS_FILE, sessions)
-    return {"message": "Session saved", "session_id": session_id}
-
-@app.get("/sessions/history/{patient_id}")
-def get_session_history(patient_id: str):
-    sessions = load_json(SESSIONS_FILE)
-    patient_sessions = [s for s in sessions if s.get("patient_id") == patient_id]
-    return {"sessions": sorted(patient_sessions, key=lambda x: x.get("created_at", ""), reverse=True)}
-
-@app.post("/exercises/add")
-def add_exercise(exercise: ExerciseConfig):
-    exercises = load_json(EXERCISES_FILE)
-    
-    exercise_id = str(len(exercises) + 1)
-    exercises.append({
-        "id": exercise_id,
-        "name": exercise.name,
-        "category": exercise.category,
-        "description": exercise.description,
-        "target_reps": exercise.target_reps,
-        "config_json": exercise.config_json
-    })
-    save_json(EXERCISES_FILE, exercises)
-    return {"message": "Exercise added", "id": exercise_id}
-
-@app.get("/exercises")
-def get_exercises():
-    exercises = load_json(EXERCISES_FILE)
-    return {"exercises": exercises}
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from datetime import date, datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Optional
+from itertools import chain
+import base64
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+from cohort_analytics import GROUP_BY, CohortAggregates
+from exercise_config import ExerciseLibrary, compile_exercise
+from job_queue import JOB_STATES, JobContext, JobQueue
+from rescoring import Rescorer, with_thresholds
+from session_archive import SessionArchive
+from session_export import EXPORT_FORMATS, created_at_bound, filter_sessions, iter_export
+from session_timeline import decode_timeline, query_timeline
+from storage import IdAllocator, file_lock, file_version, iter_json_array, load_json, read_json_strict, save_bytes, save_json, update_json
+
+app = FastAPI(title="CATS - Clinical AI Training System")
+
+# CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Large payloads (session history) are gzipped for clients that accept it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# JSON Storage paths
+DATA_DIR = Path("data")
+DATA_DIR.mkdir(exist_ok=True)
+USERS_FILE = DATA_DIR / "users.json"
+EXERCISES_FILE = DATA_DIR / "exercises.json"
+SESSIONS_FILE = DATA_DIR / "sessions.json"
+COUNTERS_FILE = DATA_DIR / "counters.json"
+TIMELINES_DIR = DATA_DIR / "timelines"
+TIMELINES_DIR.mkdir(exist_ok=True)
+ARCHIVE_DIR = DATA_DIR / "archive"
+JOBS_FILE = DATA_DIR / "jobs.json"
+EXPORTS_DIR = DATA_DIR / "exports"
+RESCORING_DIR = DATA_DIR / "rescoring"
+
+# Live streaming: each binary message is NUM_LANDMARKS * 3 little-endian float32
+# values laid out as (x, y, visibility); an empty message means no pose in frame.
+NUM_LANDMARKS = 33
+LANDMARK_FRAME_BYTES = NUM_LANDMARKS * 3 * 4
+LIVE_METRIC_PRECISION = {"reps": None, "fatigue_detected": None, "avg_rom": 1, "avg_speed": 3, "rom_reduction": 1}
+live_sessions = {}
+
+# Safe with `--workers N`: writes hold a file lock and replace files atomically,
+# and ids come from a shared monotonic counter
+ids = IdAllocator(COUNTERS_FILE)
+
+# Sessions older than the retention window live in compressed monthly segments
+# (see scripts/archive_sessions.py); sessions.json only holds recent ones
+session_archive = SessionArchive(ARCHIVE_DIR)
+
+# Compiled exercise definitions, reloaded when exercises.json changes
+exercise_library = ExerciseLibrary(EXERCISES_FILE)
+
+# Per-exercise/per-week session sums for cohort analytics, updated on every save
+cohort = CohortAggregates(DATA_DIR / "cohort_aggregates.json", SESSIONS_FILE, session_archive)
+
+def conditional_json(request: Request, files: list, build: Callable[[], dict], scope: str = "") -> Response:
+    """JSON response with ETag/Last-Modified from the files' versions; 304 if the client is current
+    
+    Versions are read before build() reads the data, so a concurrent write can
+    at worst pair old data with an old ETag, never new data with a stale one.
+    """
+    versions = [file_version(f) for f in files]
+    counter = sum(v[0] for v in versions)
+    mtime_ns = max(v[1] for v in versions)
+    size = sum(v[2] for v in versions)
+    etag = f'W/"{scope}{counter:x}-{mtime_ns:x}-{size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(mtime_ns / 1e9, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+            if mtime_ns // 1_000_000_000 <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+    
+    return JSONResponse(build(), headers=headers)
+
+class PatientIndex:
+    """Name-sorted index of patient users joined with each patient's latest session
+    
+    Requests run on a thread pool, so every read and update holds `lock`.
+    """
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self.patients = []
+        self.search_keys = []
+        self.latest = {}
+        self.session_counts = {}
+    
+    @staticmethod
+    def disk_version() -> tuple:
+        return (file_version(USERS_FILE), file_version(SESSIONS_FILE), file_version(session_archive.manifest_file))
+    
+    def refresh(self):
+        """Rebuild only if users.json, sessions.json or the archive manifest changed on disk"""
+        with self.lock:
+            self._refresh()
+    
+    def _refresh(self):
+        version = self.disk_version()
+        if version == self.version:
+            return
+        
+        users = load_json(USERS_FILE)
+        self.patients = sorted((u for u in users.values() if u.get("role") == "patient"), key=lambda u: u.get("name", "").lower())
+        self.search_keys = [f"{u.get('name', '')} {u.get('email', '')}".lower() for u in self.patients]
+        
+        # Archived sessions come from the manifest's per-patient totals, not the segments
+        self.latest = {}
+        self.session_counts = {}
+        for patient_id, archived in session_archive.manifest().get("patients", {}).items():
+            self.session_counts[patient_id] = archived["count"]
+            self.latest[patient_id] = archived["latest"]
+        for session in iter_json_array(SESSIONS_FILE):
+            self.add_session(session)
+        self.version = version
+    
+    def add_session(self, session: dict):
+        """Fold a newly saved session into the index without a rebuild"""
+        patient_id = session.get("patient_id")
+        self.session_counts[patient_id] = self.session_counts.get(patient_id, 0) + 1
+        latest = self.latest.get(patient_id)
+        if latest is None or session.get("created_at", "") >= latest.get("created_at", ""):
+            self.latest[patient_id] = session
+    
+    def add_saved_session(self, session: dict, sessions_version: tuple):
+        """Fold in a session this process just saved, instead of re-reading the sessions file
+        
+        The caller still holds the sessions file lock and passes the file's
+        version from before the save. If the index wasn't built from exactly
+        that version it is left alone, and the next refresh rebuilds it.
+        """
+        with self.lock:
+            if self.version is None or self.version[1] != sessions_version:
+                return
+            self.add_session(session)
+            # Only the sessions part moves; a users/manifest change still triggers a rebuild
+            self.version = (self.version[0], file_version(SESSIONS_FILE), self.version[2])
+    
+    def search(self, query: str, offset: int, limit: int) -> dict:
+        with self.lock:
+            self._refresh()
+            return self._search(query, offset, limit)
+    
+    def _search(self, query: str, offset: int, limit: int) -> dict:
+        query = query.strip().lower()
+        if query:
+            matches = [p for p, key in zip(self.patients, self.search_keys) if query in key]
+        else:
+            matches = self.patients
+        
+        rows = []
+        for patient in matches[offset:offset + limit]:
+            latest = self.latest.get(patient["id"])
+            rows.append({
+                "id": patient["id"],
+                "name": patient.get("name"),
+                "email": patient.get("email"),
+                "session_count": self.session_counts.get(patient["id"], 0),
+                "latest_session": None if latest is None else {
+                    "id": latest.get("id"),
+                    "exercise_id": latest.get("exercise_id"),
+                    "completion_percentage": latest.get("completion_percentage"),
+                    "fatigue_detected": latest.get("fatigue_detected"),
+                    "created_at": latest.get("created_at"),
+                },
+            })
+        return {"patients": rows, "total": len(matches), "offset": offset, "limit": limit}
+
+patient_index = PatientIndex()
+
+# Re-scored results per exercise and threshold version; stored sessions keep their original scores
+rescorer = Rescorer(TIMELINES_DIR, RESCORING_DIR)
+
+# Maintenance work (archiving, aggregate rebuilds, exports) runs on background
+# workers so it never holds up patient-facing requests
+jobs = JobQueue(JOBS_FILE, ids, workers=int(os.environ.get("CATS_JOB_WORKERS", "2")))
+
+def export_selection(start: Optional[str], end: Optional[str], patient_id: Optional[str], exercise_id: Optional[str],
+                     progress: Optional[Callable[[float, str], None]] = None):
+    """Archived and hot sessions matching an export's filters, streamed, each session once
+    
+    progress(fraction, message) is called as sessions are read, against the
+    archive manifest's segment counts plus the hot file's session count.
+    """
+    # A session can briefly be in both tiers if archiving was interrupted; the
+    # hot copy wins, as in get_session_history. Only the hot file's ids are held.
+    hot_ids = {session.get("id") for session in iter_json_array(SESSIONS_FILE)}
+    segments = session_archive.segments(start, end, patient_id)
+    total = sum(segment["count"] for segment in segments) + len(hot_ids)
+    read = [0]
+    
+    def reading(sessions):
+        for session in sessions:
+            read[0] += 1
+            if progress and read[0] % 1000 == 0:
+                # Sessions saved since the totals were taken can push past them
+                progress(min(read[0] / max(total, 1), 0.99), f"{read[0]} of about {total} sessions read")
+            yield session
+    
+    archived = reading(chain.from_iterable(session_archive.read_segment(segment["file"]) for segment in segments))
+    archived = (s for s in archived if s.get("id") not in hot_ids)
+    return filter_sessions(
+        chain(archived, reading(iter_json_array(SESSIONS_FILE))),
+        start=start,
+        end=end,
+        patient_id=patient_id,
+        exercise_id=exercise_id
+    )
+
+def archive_job(ctx: JobContext) -> dict:
+    days = int(ctx.params.get("older_than_days", os.environ.get("CATS_RETENTION_DAYS", "180")))
+    ctx.progress(0.0, f"archiving sessions older than {days} days", force=True)
+    return session_archive.archive(SESSIONS_FILE, days, progress=ctx.progress)
+
+def cohort_rebuild_job(ctx: JobContext) -> dict:
+    ctx.progress(0.0, "recomputing aggregates", force=True)
+    return {"rows": cohort.rebuild(progress=ctx.progress)}
+
+def export_job(ctx: JobContext) -> dict:
+    """Write an export to data/exports for download from /jobs/{id}/download"""
+    params = ctx.params
+    export_format = params.get("format", "csv")
+    counted = [0]
+    
+    def counting(sessions):
+        for session in sessions:
+            counted[0] += 1
+            yield session
+    
+    EXPORTS_DIR.mkdir(exist_ok=True)
+    export_file = EXPORTS_DIR / f"job-{ctx.job_id}.{export_format}"
+    sessions = export_selection(created_at_bound(params.get("start")), created_at_bound(params.get("end")),
+                                params.get("patient_id"), params.get("exercise_id"), progress=ctx.progress)
+    try:
+        with open(export_file, 'wb') as f:
+            for chunk in iter_export(counting(sessions), export_format):
+                f.write(chunk)
+    except BaseException:
+        export_file.unlink(missing_ok=True)
+        raise
+    return {"file": export_file.name, "sessions": counted[0], "bytes": export_file.stat().st_size}
+
+def expire_export(job: dict):
+    """Delete the file of an export job that is being dropped from the job table"""
+    for export_file in EXPORTS_DIR.glob(f"job-{job['id']}.*"):
+        export_file.unlink(missing_ok=True)
+
+def rescore_definition(params: dict):
+    """Definition to re-score with: the exercise as stored, plus any threshold overrides in params
+    
+    KeyError if the exercise doesn't exist, ValueError if the result is invalid.
+    """
+    exercise_id = str(params.get("exercise_id", ""))
+    record = next((e for e in load_json(EXERCISES_FILE) if str(e.get("id")) == exercise_id), None)
+    if record is None:
+        raise KeyError(exercise_id)
+    return compile_exercise(with_thresholds(record, params.get("down_angle"), params.get("up_angle"), params.get("target_reps")))
+
+def rescore_job(ctx: JobContext) -> dict:
+    """Replay every stored timeline of an exercise under new thresholds across a process pool"""
+    definition = rescore_definition(ctx.params)
+    ctx.progress(0.0, f"re-scoring exercise {definition.exercise_id} at {definition.down_angle:g}/{definition.up_angle:g}", force=True)
+    sessions = chain(session_archive.iter_sessions(), iter_json_array(SESSIONS_FILE))
+    return rescorer.rescore(definition, sessions, processes=ctx.params.get("processes"), progress=ctx.progress)
+
+jobs.register("archive", archive_job)
+jobs.register("cohort_rebuild", cohort_rebuild_job)
+jobs.register("export", export_job, on_expire=expire_export)
+jobs.register("rescore", rescore_job)
+
+@app.on_event("startup")
+def start_jobs():
+    jobs.start()
+
+@app.on_event("shutdown")
+def stop_jobs():
+    jobs.stop()
+
+# Pydantic models
+class UserCreate(BaseModel):
+    email: str
+    password: str
+    name: str
+    role: str
+
+class SessionData(BaseModel):
+    patient_id: str
+    exercise_id: str
+    completion_percentage: float
+    avg_speed: float
+    fatigue_detected: bool
+    form_errors: int
+    session_summary: dict
+    timeline: Optional[str] = None  # base64 of a session_timeline blob
+
+class ExerciseConfig(BaseModel):
+    name: str
+    category: str
+    description: str
+    target_reps: int
+    config_json: dict
+
+# Routes
+@app.post("/auth/register")
+def register(user: UserCreate):
+    with update_json(USERS_FILE) as users:
+        if user.email in users:
+            raise HTTPException(status_code=400, detail="Email already exists")
+        
+        user_id = ids.next("users", (u.get("id", "") for u in users.values()))
+        users[user.email] = {
+            "id": user_id,
+            "email": user.email,
+            "password": user.password,
+            "name": user.name,
+            "role": user.role,
+            "created_at": datetime.now().isoformat()
+        }
+    return {"message": "User created", "email": user.email, "id": user_id}
+
+@app.post("/auth/login")
+def login(email: str, password: str):
+    users = load_json(USERS_FILE)
+    
+    if email not in users or users[email]["password"] != password:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    user = users[email]
+    return {"id": user["id"], "name": user["name"], "role": user["role"]}
+
+@app.post("/sessions/save")
+def save_session(session_data: SessionData):
+    timeline_blob = None
+    timeline_points = 0
+    if session_data.timeline:
+        try:
+            timeline_blob = base64.b64decode(session_data.timeline, validate=True)
+            timeline_points = len(decode_timeline(timeline_blob)[0])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid timeline: {e}")
+    
+    # update_json, spelled out so the roster index is updated before the lock is released
+    with file_lock(SESSIONS_FILE):
+        sessions = read_json_strict(SESSIONS_FILE)
+        sessions_version = file_version(SESSIONS_FILE)
+        
+        session_id = ids.next("sessions", (s.get("id", "") for s in sessions))
+        if timeline_blob is not None:
+            save_bytes(TIMELINES_DIR / f"{session_id}.bin", timeline_blob)
+        
+        session = {
+            "id": session_id,
+            "patient_id": session_data.patient_id,
+            "exercise_id": session_data.exercise_id,
+            "completion_percentage": session_data.completion_percentage,
+            "avg_speed": session_data.avg_speed,
+            "fatigue_detected": session_data.fatigue_detected,
+            "form_errors": session_data.form_errors,
+            "session_summary": session_data.session_summary,
+            "timeline_points": timeline_points,
+            "created_at": datetime.now().isoformat()
+        }
+        sessions.append(session)
+        cohort.add_session(session)
+        save_json(SESSIONS_FILE, sessions)
+        patient_index.add_saved_session(session, sessions_version)
+    return {"message": "Session saved", "session_id": session_id}
+
+@app.get("/sessions/history/{patient_id}")
+def get_session_history(patient_id: str, request: Request, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Patient's sessions created in [start, end), newest first
+    
+    Without a start only the hot file is read; `archived_count` says how many
+    older sessions the archive holds for the patient, and a start before
+    `archived_before` includes them. Archive segments are only opened when
+    their date range and patient list can match.
+    """
+    start_iso = created_at_bound(start)
+    end_iso = created_at_bound(end)
+    
+    def build():
+        manifest = session_archive.manifest()
+        archived_before = manifest.get("archived_before") or None
+        patient_sessions = list(filter_sessions(load_json(SESSIONS_FILE), start_iso, end_iso, patient_id=patient_id))
+        if start_iso is not None and archived_before is not None and start_iso < archived_before:
+            # A session can briefly be in both tiers if archiving was interrupted
+            seen = {s.get("id") for s in patient_sessions}
+            for session in session_archive.iter_sessions(start_iso, end_iso, patient_id):
+                if session.get("id") not in seen:
+                    patient_sessions.append(session)
+        return {
+            "sessions": sorted(patient_sessions, key=lambda x: x.get("created_at", ""), reverse=True),
+            "archived_before": archived_before,
+            "archived_count": manifest.get("patients", {}).get(patient_id, {}).get("count", 0),
+        }
+    
+    scope = f"{patient_id}-{start_iso or ''}-{end_iso or ''}-"
+    return conditional_json(request, [SESSIONS_FILE, session_archive.manifest_file], build, scope=scope)
+
+@app.get("/sessions/export")
+def export_sessions(format: str = "csv", start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    patient_id: Optional[str] = None, exercise_id: Optional[str] = None):
+    """Stream matching sessions as CSV or Parquet without loading the sessions file"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    
+    start_iso = created_at_bound(start)
+    end_iso = created_at_bound(end)
+    try:
+        chunks = iter_export(export_selection(start_iso, end_iso, patient_id, exercise_id), format)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+    
+    filename = f"sessions-{datetime.now():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/sessions/{session_id}/timeline")
+def get_session_timeline(session_id: str, start_ms: int = 0, end_ms: Optional[int] = None, resolution_ms: int = 0):
+    """Return a time range of a session's timeline, bucketed to resolution_ms if given"""
+    timeline_file = TIMELINES_DIR / f"{Path(session_id).name}.bin"
+    if not timeline_file.exists():
+        raise HTTPException(status_code=404, detail="No timeline for this session")
+    
+    points, posture_errors = decode_timeline(timeline_file.read_bytes())
+    timeline = query_timeline(points, start_ms, end_ms, resolution_ms)
+    timeline["posture_errors"] = posture_errors
+    return {"session_id": session_id, "timeline": timeline}
+
+@app.get("/patients")
+def get_patients(q: str = "", offset: int = 0, limit: int = 50):
+    """Paginated, searchable patient roster with each patient's latest session"""
+    if offset < 0 or not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 500")
+    return patient_index.search(q, offset, limit)
+
+@app.get("/analytics/cohort")
+def get_cohort_analytics(request: Request, exercise_id: Optional[str] = None, start: Optional[date] = None, end: Optional[date] = None,
+                         patient_ids: Optional[str] = None, group_by: str = "week"):
+    """Cohort averages per week, patient or exercise from the materialized aggregates
+    
+    patient_ids is a comma-separated list; start/end select the weeks overlapping [start, end).
+    """
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(GROUP_BY)}")
+    
+    def build():
+        return cohort.query(
+            exercise_id=exercise_id,
+            start=start.isoformat() if start else None,
+            end=end.isoformat() if end else None,
+            patient_ids=[p.strip() for p in patient_ids.split(",") if p.strip()] if patient_ids else None,
+            group_by=group_by
+        )
+    
+    if not cohort.built():
+        # Building reads every stored session; leave it to a background job
+        job = jobs.submit("cohort_rebuild")
+        return JSONResponse(status_code=503, headers={"Retry-After": "5"},
+                            content={"detail": "Cohort aggregates are being built", "job": job})
+    scope = f"cohort-{exercise_id}-{start}-{end}-{patient_ids}-{group_by}-"
+    return conditional_json(request, [cohort.aggregates_file], build, scope=scope)
+
+@app.post("/exercises/add")
+def add_exercise(exercise: ExerciseConfig):
+    record = {
+        "name": exercise.name,
+        "category": exercise.category,
+        "description": exercise.description,
+        "target_reps": exercise.target_reps,
+        "config_json": exercise.config_json
+    }
+    # Reject configs that would otherwise only fail once a session starts
+    try:
+        compile_exercise(record)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    with update_json(EXERCISES_FILE) as exercises:
+        exercise_id = ids.next("exercises", (e.get("id", "") for e in exercises))
+        exercises.append({"id": exercise_id, **record})
+    return {"message": "Exercise added", "id": exercise_id}
+
+@app.get("/exercises")
+def get_exercises(request: Request):
+    return conditional_json(request, [EXERCISES_FILE], lambda: {"exercises": load_json(EXERCISES_FILE)})
+
+@app.get("/exercises/{exercise_id}/rescoring")
+def get_rescoring_versions(exercise_id: str):
+    """Result sets from re-scoring this exercise's sessions (POST /jobs/rescore), newest first"""
+    return {"versions": rescorer.versions(exercise_id)}
+
+@app.get("/exercises/{exercise_id}/rescoring/{version}")
+def get_rescoring_results(exercise_id: str, version: str):
+    """Per-session re-scored reps, completion and fatigue next to the original scores"""
+    results = rescorer.load(exercise_id, version)
+    if results is None:
+        raise HTTPException(status_code=404, detail="No re-scoring results for this version")
+    return results
+
+@app.post("/jobs/{kind}", status_code=202)
+def submit_job(kind: str, params: Optional[dict] = None):
+    """Queue a background job; an identical queued or running job is returned instead of a duplicate"""
+    if kind not in jobs.handlers:
+        raise HTTPException(status_code=404, detail=f"Unknown job kind; one of: {', '.join(jobs.handlers)}")
+    if kind == "export":
+        if (params or {}).get("format", "csv") not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        try:
+            created_at_bound((params or {}).get("start"))
+            created_at_bound((params or {}).get("end"))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="start and end must be ISO dates or timestamps")
+    if kind == "rescore":
+        try:
+            rescore_definition(params or {})
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return jobs.submit(kind, params)
+
+@app.get("/jobs")
+def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    if status is not None and status not in JOB_STATES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(JOB_STATES)}")
+    return {"jobs": jobs.list(kind, status, limit)}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status, progress (0-1), message and, once finished, result or error of a job"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/download")
+def download_job_result(job_id: str):
+    """File written by a finished export job"""
+    job = jobs.get(job_id)
+    if job is None or job["kind"] != "export":
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    export_file = EXPORTS_DIR / job["result"]["file"]
+    if not export_file.exists():
+        raise HTTPException(status_code=410, detail="Export file was removed")
+    return FileResponse(export_file, media_type=EXPORT_FORMATS[job["params"].get("format", "csv")], filename=export_file.name)
+
+def decode_landmark_frame(payload: bytes) -> list:
+    """Decode a binary float32 landmark frame into (x, y, visibility) tuples"""
+    if not payload:
+        return []
+    if len(payload) != LANDMARK_FRAME_BYTES:
+        raise ValueError(f"Expected {LANDMARK_FRAME_BYTES} bytes, got {len(payload)}")
+    points = np.frombuffer(payload, dtype="<f4").reshape(NUM_LANDMARKS, 3)
+    return [tuple(p) for p in points.tolist()]
+
+def metrics_delta(previous: dict, metrics: dict, posture_errors: list) -> dict:
+    """Return only the live metrics that changed since the last push"""
+    current = {}
+    for key, precision in LIVE_METRIC_PRECISION.items():
+        value = metrics.get(key)
+        current[key] = round(value, precision) if precision is not None else value
+    current["posture_errors"] = posture_errors
+    return {k: v for k, v in current.items() if previous.get(k) != v}
+
+@app.websocket("/sessions/stream/{patient_id}/{exercise_id}")
+async def stream_session(websocket: WebSocket, patient_id: str, exercise_id: str):
+    """Run rep counting server-side on a stream of landmark frames (never video)"""
+    # Imported here: exercise_engine pulls in pose_detector and with it OpenCV,
+    # which none of the REST endpoints need
+    from exercise_engine import ExerciseEngine
+    
+    try:
+        engine = ExerciseEngine(exercise_library.get(exercise_id))
+    except KeyError:
+        await websocket.close(code=4404, reason="Exercise not found")
+        return
+    except ValueError as e:
+        await websocket.close(code=4422, reason=str(e))
+        return
+    
+    await websocket.accept()
+    station = f"{patient_id}:{exercise_id}:{id(websocket)}"
+    last_sent = {}
+    live_sessions[station] = {"patient_id": patient_id, "exercise_id": exercise_id, "started_at": datetime.now().isoformat()}
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            payload = message.get("bytes")
+            if payload is None:
+                await websocket.close(code=1003, reason="Landmark frames must be binary")
+                break
+            try:
+                landmarks = decode_landmark_frame(payload)
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+            
+            metrics, posture_errors = engine.process_landmarks(landmarks)
+            delta = metrics_delta(last_sent, metrics, posture_errors)
+            live_sessions[station].update(metrics, posture_errors=posture_errors, updated_at=datetime.now().isoformat())
+            
+            if delta:
+                last_sent.update(delta)
+                delta["frame_count"] = metrics["frame_count"]
+                await websocket.send_json(delta)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_sessions.pop(station, None)
+
+@app.get("/sessions/live")
+def get_live_sessions():
+    return {"sessions": list(live_sessions.values())}
+
+@app.get("/health")
+def health_check():
+    return {"status": "healthy"}
+
+if __name__ == "__main__":
+    import uvicorn
+    # Multiple workers share the JSON files safely; live sessions and the roster
+    # index are per-worker in-memory state
+    workers = int(os.environ.get("CATS_WORKERS", "1"))
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
@@ -0,0 +1,82 @@
+import numpy as np
+from typing import Dict, List
+
+METRICS_DTYPE = np.dtype([
+    ("reps", np.int32),
+    ("avg_rom", np.float32),
+    ("avg_speed", np.float32),
+    ("rom_reduction", np.float32),
+    ("fatigue_detected", np.bool_),
+    ("posture_errors", np.uint64),  # bit i set = error_names[i] present
+])
+
+class MetricsBuffer:
+    """Growable columnar store of per-frame metrics with posture errors as a bitmask"""
+    
+    def __init__(self, capacity: int = 4096):
+        self.data = np.zeros(capacity, dtype=METRICS_DTYPE)
+        self.size = 0
+        self.error_names = []
+        self.error_bits = {}
+        self.dropped_errors = set()  # names past the 64-bit mask, not recorded
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def _error_mask(self, posture_errors: List[str]) -> int:
+        """Encode posture error names as a bitmask, assigning bits on first sight"""
+        mask = 0
+        for error in posture_errors:
+            bit = self.error_bits.get(error)
+            if bit is None:
+                if len(self.error_names) == 64:
+                    if error not in self.dropped_errors:
+                        self.dropped_errors.add(error)
+                        print(f"[v0] Metrics buffer: more than 64 posture error types, not recording {error!r}")
+                    continue
+                bit = self.error_bits[error] = len(self.error_names)
+                self.error_names.append(error)
+            mask |= 1 << bit
+        return mask
+    
+    def append(self, metrics: Dict, posture_errors: List[str]):
+        """Record one frame's metrics"""
+        if self.size == len(self.data):
+            grown = np.zeros(len(self.data) * 2, dtype=METRICS_DTYPE)
+            grown[:self.size] = self.data
+            self.data = grown
+        
+        self.data[self.size] = (
+            metrics["reps"],
+            metrics["avg_rom"],
+            metrics["avg_speed"],
+            metrics["rom_reduction"],
+            metrics["fatigue_detected"],
+            self._error_mask(posture_errors),
+        )
+        self.size += 1
+    
+    def column(self, name: str) -> np.ndarray:
+        """View of one recorded column"""
+        return self.data[name][:self.size]
+    
+    def mean(self, name: str) -> float:
+        return float(self.column(name).mean(dtype=np.float64)) if self.size else 0.0
+    
+    def any(self, name: str) -> bool:
+        return bool(self.column(name).any())
+    
+    def frames_with_errors(self) -> int:
+        """Number of frames with at least one posture error"""
+        return int(np.count_nonzero(self.column("posture_errors")))
+    
+    def error_counts(self) -> Dict[str, int]:
+        """Number of frames each posture error was present in"""
+        masks = self.column("posture_errors")
+        return {
+            name: int(np.count_nonzero(masks & np.uint64(1 << bit)))
+            for bit, name in enumerate(self.error_names)
+        }
+    
+    def clear(self):
+        self.size = 0
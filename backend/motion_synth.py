@@ -0,0 +1,258 @@
+import math
+import numpy as np
+from typing import Dict, Iterator, List, Optional
+from exercise_config import ExerciseDefinition
+
+NUM_LANDMARKS = 33
+
+# Upright, camera-facing BlazePose skeleton in normalized image coordinates
+STANDING_POSE = np.array([
+    (0.50, 0.20), (0.51, 0.18), (0.52, 0.18), (0.53, 0.18), (0.49, 0.18), (0.48, 0.18), (0.47, 0.18),
+    (0.55, 0.19), (0.45, 0.19), (0.51, 0.23), (0.49, 0.23), (0.58, 0.30), (0.42, 0.30), (0.60, 0.42),
+    (0.40, 0.42), (0.61, 0.53), (0.39, 0.53), (0.615, 0.56), (0.385, 0.56), (0.61, 0.57), (0.39, 0.57),
+    (0.60, 0.555), (0.40, 0.555), (0.55, 0.55), (0.45, 0.55), (0.55, 0.70), (0.45, 0.70), (0.55, 0.85),
+    (0.45, 0.85), (0.555, 0.87), (0.445, 0.87), (0.56, 0.90), (0.44, 0.90),
+])
+
+# Landmarks carried along when a landmark moves (head with the nose, forearm and hand with the elbow, ...)
+DESCENDANTS = {
+    0: (1, 2, 3, 4, 5, 6, 7, 8, 9, 10),
+    11: (13, 15, 17, 19, 21), 12: (14, 16, 18, 20, 22),
+    13: (15, 17, 19, 21), 14: (16, 18, 20, 22),
+    15: (17, 19, 21), 16: (18, 20, 22),
+    23: (25, 27, 29, 31), 24: (26, 28, 30, 32),
+    25: (27, 29, 31), 26: (28, 30, 32),
+    27: (29, 31), 28: (30, 32),
+}
+
+def subtree(landmark: int) -> List[int]:
+    return [landmark, *DESCENDANTS.get(landmark, ())]
+
+class SyntheticMotion:
+    """A generated landmark stream plus the ground truth it was built from
+    
+    landmarks: (frames, 33, 3) float32 normalized (x, y, visibility), NaN where the person dropped out
+    timestamps: (frames,) seconds; angles: (frames, sides) noise-free joint angles
+    rep_index: (frames,) rep each frame belongs to, -1 while holding between reps
+    rep_peaks: (reps,) top angle of each rep; faults: (frames, rules) posture rule violations,
+    columns named by fault_names; expected_reps: reps the rep counter should score on the
+    noise-free angles; min_reps/max_reps: the range a correct counter can report once
+    landmark noise makes reps whose extremes lie near a threshold go either way.
+    """
+    
+    def __init__(self, landmarks: np.ndarray, timestamps: np.ndarray, angles: np.ndarray, rep_index: np.ndarray,
+                 rep_peaks: np.ndarray, faults: np.ndarray, fault_names: List[str], expected_reps: int,
+                 min_reps: int, max_reps: int):
+        self.landmarks = landmarks
+        self.timestamps = timestamps
+        self.angles = angles
+        self.rep_index = rep_index
+        self.rep_peaks = rep_peaks
+        self.faults = faults
+        self.fault_names = fault_names
+        self.expected_reps = expected_reps
+        self.min_reps = min_reps
+        self.max_reps = max_reps
+    
+    def __len__(self) -> int:
+        return len(self.landmarks)
+    
+    @property
+    def ambiguous(self) -> bool:
+        """True when noise leaves the rep count open, so no single count can be checked"""
+        return self.min_reps != self.max_reps
+    
+    @property
+    def dropped(self) -> np.ndarray:
+        """(frames,) True where no person is detected"""
+        return np.isnan(self.landmarks[:, 0, 0])
+    
+    def landmark_lists(self) -> Iterator[list]:
+        """Per-frame landmarks as (x, y, visibility) lists, like PoseDetector.get_landmarks ([] when dropped)"""
+        for frame, is_dropped in zip(self.landmarks, self.dropped.tolist()):
+            yield [] if is_dropped else frame.tolist()
+    
+    def replay_frames(self) -> List[Optional[np.ndarray]]:
+        """Frames for a pose_backends.ReplayBackend"""
+        return [None if is_dropped else frame for frame, is_dropped in zip(self.landmarks, self.dropped.tolist())]
+
+def _fault_offsets(definition: ExerciseDefinition, points: np.ndarray, rule: int, frames: np.ndarray,
+                   envelope: np.ndarray, direction: float):
+    """Shift the rule's "a" landmarks (and what hangs off them) so it is violated at the envelope's peak"""
+    rules = definition.posture_rules
+    weights = rules.weights[rule]
+    axis = rules.axis[rule]
+    threshold = rules.threshold[rule]
+    margin = max(0.5 * abs(threshold), 0.03)
+    values = points[frames][:, :, axis] @ weights
+    if rules.use_abs[rule]:
+        target = direction * (threshold + margin) if rules.sign[rule] > 0 else np.zeros_like(values)
+    else:
+        target = threshold + rules.sign[rule] * margin
+    shift = (target - values) * envelope
+    
+    moved = sorted({i for a in np.flatnonzero(weights > 0).tolist() for i in subtree(a)})
+    points[frames[:, None], np.array(moved)[None, :], axis] += shift[:, None]
+
+def _count_reps(went_up: np.ndarray, went_down: np.ndarray) -> int:
+    """Rep counter on (frames, sides) threshold crossings in order: a side scores when it
+    passes up_angle after having been below down_angle, and either side scoring counts"""
+    armed = np.ones(went_up.shape[1], dtype=bool)
+    side_reps = np.zeros(went_up.shape[1], dtype=int)
+    for up, down in zip(went_up, went_down):
+        armed |= down
+        scored = armed & up
+        side_reps += scored
+        armed &= ~scored
+    return int(side_reps.max())
+
+_upper_tail = np.vectorize(lambda z: 0.5 * math.erfc(z / math.sqrt(2)), otypes=[np.float64])
+
+def _angle_noise(points: np.ndarray, triplets: np.ndarray, noise: float) -> np.ndarray:
+    """(frames, joints) std of each joint angle, to first order, when every landmark
+    coordinate gets Gaussian jitter of std `noise`"""
+    step = 1e-5
+    base = _joint_angles(points, triplets)
+    variance = np.zeros_like(base)
+    for landmark in np.unique(triplets).tolist():
+        for axis in (0, 1):
+            shifted = points.copy()
+            shifted[:, landmark, axis] += step
+            variance += ((_joint_angles(shifted, triplets) - base) / step) ** 2
+    return noise * np.sqrt(variance)
+
+def _runs(mask: np.ndarray):
+    """(start, end) of every run of True in a 1-D mask"""
+    edges = np.flatnonzero(np.diff(np.r_[0, mask.astype(np.int8), 0]))
+    return zip(edges[::2].tolist(), edges[1::2].tolist())
+
+def _rep_range(definition: ExerciseDefinition, angles: np.ndarray, sigma: np.ndarray):
+    """Fewest and most reps the counter can score when each frame's (frames, sides) noise-free
+    angle gets Gaussian noise of std `sigma`
+    
+    Frames that could cross a threshold come in runs (one per rep peak or trough). A run
+    crosses near-certainly or only possibly, depending on how close its frames come;
+    certain crossings alone give the fewest reps, every possible one the most. Runs where
+    both thresholds are reachable (angles too noisy to tell) may cross back and forth, so
+    they count frame by frame towards the most and not at all towards the fewest.
+    """
+    possible, certain = 1e-5, 1 - 1e-3
+    sigma = np.maximum(sigma, 1e-9)
+    p_up = _upper_tail((definition.up_angle - angles) / sigma)
+    p_down = _upper_tail((angles - definition.down_angle) / sigma)
+    may_up, may_down = p_up > possible, p_down > possible
+    
+    shape = angles.shape
+    fewest_up, fewest_down = np.zeros(shape, dtype=bool), np.zeros(shape, dtype=bool)
+    most_up, most_down = np.zeros(shape, dtype=bool), np.zeros(shape, dtype=bool)
+    for side in range(shape[1]):
+        for start, end in _runs(may_up[:, side] | may_down[:, side]):
+            up, down = may_up[start:end, side], may_down[start:end, side]
+            if up.any() and down.any():
+                most_up[start:end, side] = up
+                most_down[start:end, side] = down
+                continue
+            p, fewest, most = (p_up, fewest_up, most_up) if up.any() else (p_down, fewest_down, most_down)
+            most[start, side] = True
+            fewest[start, side] = -np.expm1(np.log1p(-np.minimum(p[start:end, side], 1 - 1e-12)).sum()) >= certain
+    return _count_reps(fewest_up, fewest_down), _count_reps(most_up, most_down)
+
+def generate_motion(definition: ExerciseDefinition, reps: int = 10, fps: float = 30, tempo: float = 3.0,
+                    tempo_jitter: float = 0.0, hold: float = 0.5, rom_decay: float = 0.0, asymmetry: float = 0.0,
+                    low_angle: Optional[float] = None, high_angle: Optional[float] = None, noise: float = 0.0,
+                    dropout_rate: float = 0.0, dropout_frames: float = 5.0,
+                    posture_faults: Optional[Dict[str, float]] = None, seed: Optional[int] = None) -> SyntheticMotion:
+    """Synthesize `reps` repetitions of an exercise as a 33-landmark stream
+    
+    Each rep swings the exercise's left/right joints from `low_angle` up to
+    `high_angle` (default: just past the down/up thresholds) and back in
+    `tempo` seconds (+/- `tempo_jitter` as a fraction), then holds for
+    `hold` seconds. `rom_decay` is the fraction of range of motion lost by the
+    last rep (fatigue); `asymmetry` takes that many degrees off the right side's
+    peak. `noise` is the landmark jitter std in normalized units; each frame
+    starts a dropout of ~`dropout_frames` frames with probability
+    `dropout_rate`. `posture_faults` maps posture rule names to the fraction
+    of reps in which the fault appears, peaking mid-rep. Same seed, same stream.
+    """
+    rng = np.random.default_rng(seed)
+    posture_faults = posture_faults or {}
+    rules = definition.posture_rules
+    unknown = set(posture_faults) - set(rules.errors)
+    if unknown:
+        raise ValueError(f"Unknown posture faults {sorted(unknown)}; exercise rules are {rules.errors}")
+    low = definition.down_angle - 15 if low_angle is None else low_angle
+    high = min(definition.up_angle + 10, 178) if high_angle is None else high_angle
+    
+    # Frame layout: every rep is a rise-and-return followed by a hold at the bottom
+    rep_frames = np.maximum(np.round(fps * tempo * (1 + tempo_jitter * rng.uniform(-1, 1, reps))).astype(int), 2)
+    hold_frames = int(round(fps * hold))
+    rep_index = np.concatenate([np.r_[np.full(n, k), np.full(hold_frames, -1)] for k, n in enumerate(rep_frames)]).astype(int)
+    phase = np.concatenate([np.r_[np.arange(n) / n, np.zeros(hold_frames)] for n in rep_frames])
+    frames = len(rep_index)
+    timestamps = np.arange(frames) / fps
+    
+    decay = 1 - rom_decay * np.arange(reps) / max(reps - 1, 1)
+    rep_peaks = low + (high - low) * decay
+    sides = len(definition.sides)
+    peaks = np.tile(rep_peaks[:, None], (1, sides))
+    if sides == 2:
+        peaks[:, definition.sides.index("right")] -= asymmetry
+    lift = (1 - np.cos(2 * np.pi * phase)) / 2
+    angles = low + (peaks[np.maximum(rep_index, 0)] - low) * lift[:, None]
+    
+    # Rotate the distal segment of every side's (a, b, c) joint, and everything attached to it, about b
+    points = np.tile(STANDING_POSE, (frames, 1, 1))
+    for side, (a, b, c) in enumerate(definition.joint_triplets[:sides].tolist()):
+        ba = STANDING_POSE[a] - STANDING_POSE[b]
+        bc = STANDING_POSE[c] - STANDING_POSE[b]
+        start = np.arctan2(ba[0] * bc[1] - ba[1] * bc[0], ba @ bc)
+        turn = 1.0 if definition.sides[side] == "left" else -1.0  # limbs open away from the midline
+        delta = turn * np.radians(angles[:, side]) - start
+        cos, sin = np.cos(delta), np.sin(delta)
+        moved = subtree(c)
+        offsets = STANDING_POSE[moved] - STANDING_POSE[b]
+        points[:, moved, 0] = STANDING_POSE[b, 0] + cos[:, None] * offsets[:, 0] - sin[:, None] * offsets[:, 1]
+        points[:, moved, 1] = STANDING_POSE[b, 1] + sin[:, None] * offsets[:, 0] + cos[:, None] * offsets[:, 1]
+    
+    for name, fraction in posture_faults.items():
+        faulty = np.flatnonzero(rng.random(reps) < fraction)
+        fault_frames = np.flatnonzero(np.isin(rep_index, faulty))
+        if len(fault_frames):
+            envelope = np.sin(np.pi * phase[fault_frames]) ** 2
+            _fault_offsets(definition, points, rules.errors.index(name), fault_frames, envelope, rng.choice((-1.0, 1.0)))
+    faults = rules.evaluate_frames(points)
+    
+    # Angles the rep counter would measure without noise (posture faults can shift them)
+    triplets = definition.joint_triplets[:sides]
+    measured = _joint_angles(points, triplets)
+    clean = points.copy()
+    if noise:
+        points += rng.normal(0, noise, points.shape)
+    visibility = np.clip(0.95 - np.abs(rng.normal(0, 2 * noise, (frames, NUM_LANDMARKS))), 0, 1)
+    landmarks = np.concatenate([points, visibility[:, :, None]], axis=2).astype(np.float32)
+    
+    if dropout_rate:
+        starts = np.flatnonzero(rng.random(frames) < dropout_rate)
+        lengths = rng.geometric(1 / max(dropout_frames, 1), len(starts))
+        for start, length in zip(starts.tolist(), lengths.tolist()):
+            landmarks[start:start + length] = np.nan
+    
+    # Ground truth for the rep counter, from the noise-free angles of the frames the person is
+    # visible in (the engine skips the others)
+    visible = ~np.isnan(landmarks[:, 0, 0])
+    measured = measured[visible]
+    expected_reps = _count_reps(measured > definition.up_angle, measured < definition.down_angle)
+    min_reps = max_reps = expected_reps
+    if noise and visible.any():
+        min_reps, max_reps = _rep_range(definition, measured, _angle_noise(clean[visible], triplets, noise))
+    
+    return SyntheticMotion(landmarks, timestamps, angles, rep_index, rep_peaks, faults, list(rules.errors),
+                           expected_reps, min_reps, max_reps)
+
+def _joint_angles(points: np.ndarray, triplets: np.ndarray) -> np.ndarray:
+    """(frames, joints) angles at the middle landmark of each (a, b, c) triplet"""
+    joints = points[:, triplets, :2]
+    ba = joints[:, :, 0] - joints[:, :, 1]
+    bc = joints[:, :, 2] - joints[:, :, 1]
+    cos_angle = np.sum(ba * bc, axis=-1) / (np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1) + 1e-6)
+    return np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
@@ -0,0 +1,235 @@
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# BlazePose skeleton edges (same as mediapipe's POSE_CONNECTIONS), so drawing
+# doesn't need mediapipe when another backend is in use
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+)
+
+class Landmark:
+    """Normalized landmark with the attribute names mediapipe results use"""
+    
+    __slots__ = ("x", "y", "z", "visibility")
+    
+    def __init__(self, x: float, y: float, z: float = 0.0, visibility: float = 1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+class LandmarkList:
+    __slots__ = ("landmark",)
+    
+    def __init__(self, landmark: List[Landmark]):
+        self.landmark = landmark
+
+class PoseResults:
+    """Minimal stand-in for mediapipe's results object (pose_landmarks.landmark[i].x/y/visibility)"""
+    
+    __slots__ = ("pose_landmarks",)
+    
+    def __init__(self, landmarks: Optional[np.ndarray] = None):
+        self.pose_landmarks = None
+        if landmarks is not None:
+            self.pose_landmarks = LandmarkList([Landmark(x, y, 0.0, v) for x, y, v in np.asarray(landmarks)[:, :3].tolist()])
+
+class PoseBackend:
+    """A pose model: process() takes an RGB image and returns mediapipe-style results
+    
+    Backends are ordered by `accuracy` (higher is better) when calibrating.
+    `supports_roi` backends can be fed a person crop through process_crop().
+    """
+    
+    name = "base"
+    accuracy = 0
+    supports_roi = False
+    
+    def process(self, rgb_image):
+        raise NotImplementedError
+    
+    def process_crop(self, rgb_image):
+        """Process a person crop; must not share temporal state with process()"""
+        return self.process(rgb_image)
+    
+    def reset(self):
+        """Drop any temporal state before a new session
+        
+        MediaPipe re-detects by itself once tracking is lost, and rebuilding
+        its graph would undo the warm-up, so only replay needs this.
+        """
+    
+    def close(self):
+        pass
+
+class MediaPipeBackend(PoseBackend):
+    """MediaPipe BlazePose; complexity 0 (lite), 1 (full) or 2 (heavy) trades speed for accuracy"""
+    
+    supports_roi = True
+    
+    def __init__(self, model_complexity: int = 1, min_detection_confidence: float = 0.7,
+                 min_tracking_confidence: float = 0.7, smooth_landmarks: bool = True):
+        if model_complexity not in (0, 1, 2):
+            raise ValueError("model_complexity must be 0, 1 or 2")
+        self.model_complexity = model_complexity
+        self.name = f"mediapipe-{model_complexity}"
+        self.accuracy = model_complexity
+        self.options = {
+            "static_image_mode": False,
+            "model_complexity": model_complexity,
+            "smooth_landmarks": smooth_landmarks,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+        }
+        import mediapipe as mp
+        self.pose = mp.solutions.pose.Pose(**self.options)
+        self.crop_pose = None
+    
+    def process(self, rgb_image):
+        return self.pose.process(rgb_image)
+    
+    def process_crop(self, rgb_image):
+        """Crops move and change size every frame, so they get their own static,
+        unsmoothed graph; smoothing across crops would mix coordinate frames"""
+        if self.crop_pose is None:
+            import mediapipe as mp
+            self.crop_pose = mp.solutions.pose.Pose(**{**self.options, "static_image_mode": True, "smooth_landmarks": False})
+        return self.crop_pose.process(rgb_image)
+    
+    def close(self):
+        self.pose.close()
+        if self.crop_pose is not None:
+            self.crop_pose.close()
+
+class ReplayBackend(PoseBackend):
+    """Deterministic backend that plays back recorded landmarks, ignoring the image
+    
+    `frames` is a sequence of (33, 3) arrays of normalized (x, y, visibility);
+    None or an all-NaN frame means no person detected. Loops by default.
+    """
+    
+    name = "replay"
+    
+    def __init__(self, frames: Sequence[Optional[np.ndarray]], loop: bool = True):
+        if len(frames) == 0:
+            raise ValueError("ReplayBackend needs at least one frame")
+        self.frames = [None if f is None or np.isnan(f).all() else np.asarray(f, dtype=np.float64) for f in frames]
+        self.loop = loop
+        self.position = 0
+    
+    @classmethod
+    def from_file(cls, path: Path, loop: bool = True) -> "ReplayBackend":
+        """Load an .npy array of shape (frames, 33, 3) or a JSON list of landmark lists (null for no person)"""
+        path = Path(path)
+        if path.suffix == ".npy":
+            return cls(list(np.load(path)), loop=loop)
+        with open(path, 'r') as f:
+            return cls([None if frame is None else np.array(frame, dtype=np.float64) for frame in json.load(f)], loop=loop)
+    
+    def process(self, rgb_image):
+        if self.position >= len(self.frames):
+            if not self.loop:
+                return PoseResults(None)
+            self.position = 0
+        landmarks = self.frames[self.position]
+        self.position += 1
+        return PoseResults(landmarks)
+    
+    def reset(self):
+        self.position = 0
+
+# Candidate backends for calibration, cheapest first
+MEDIAPIPE_BACKENDS: Dict[str, Callable[[], PoseBackend]] = {
+    f"mediapipe-{complexity}": (lambda complexity=complexity: MediaPipeBackend(complexity)) for complexity in (0, 1, 2)
+}
+
+def create_backend(name: str) -> PoseBackend:
+    """Backend by name, e.g. "mediapipe-0"; KeyError for unknown names"""
+    return MEDIAPIPE_BACKENDS[name]()
+
+def measure_latency(backend: PoseBackend, frames: Sequence[np.ndarray], warmup: int = 3) -> Tuple[float, int]:
+    """(median per-frame latency in ms, frames with a person) over `frames` (RGB), after `warmup` untimed frames"""
+    for frame in frames[:warmup]:
+        backend.process(frame)
+    timings = []
+    detected = 0
+    for frame in frames[warmup:]:
+        start = time.perf_counter()
+        results = backend.process(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+        detected += results.pose_landmarks is not None
+    return statistics.median(timings), detected
+
+def calibrate(frames: Sequence[np.ndarray], target_fps: float, candidates: Optional[Dict[str, Callable[[], PoseBackend]]] = None,
+              warmup: int = 3, min_detected: float = 0.75) -> Tuple[PoseBackend, Dict]:
+    """Pick the most accurate backend whose median latency on `frames` meets `target_fps`
+    
+    Candidates are tried cheapest first and calibration stops at the first
+    one that misses the budget, so a slow machine never waits on the heavy
+    model more than once. Falls back to the cheapest backend when none fit.
+    Returns (backend, report).
+    With no person in view the landmark model never runs and every
+    complexity looks equally fast, so ValueError is raised if any candidate
+    finds a person in fewer than `min_detected` of the timed frames.
+    """
+    candidates = candidates or MEDIAPIPE_BACKENDS
+    if len(frames) <= warmup:
+        raise ValueError(f"calibration needs more than {warmup} frames")
+    budget_ms = 1000 / target_fps
+    
+    chosen = None
+    latencies = {}
+    timed = len(frames) - warmup
+    for name, factory in candidates.items():
+        backend = factory()
+        latency, detected = measure_latency(backend, frames, warmup)
+        if detected < min_detected * timed:
+            backend.close()
+            if chosen is not None:
+                chosen.close()
+            raise ValueError(f"{name} found a person in only {detected} of {timed} calibration frames")
+        latencies[name] = round(latency, 2)
+        fits = latencies[name] <= budget_ms
+        if chosen is None or (fits and backend.accuracy >= chosen.accuracy):
+            if chosen is not None:
+                chosen.close()
+            chosen = backend
+        else:
+            backend.close()
+        if not fits:
+            break
+    
+    report = {
+        "backend": chosen.name,
+        "target_fps": target_fps,
+        "budget_ms": round(budget_ms, 2),
+        "latency_ms": latencies,
+        "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return chosen, report
+
+def load_calibration(path: Path, target_fps: float) -> Optional[Dict]:
+    """Saved calibration report if one exists for this target fps"""
+    try:
+        with open(path, 'r') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if report.get("target_fps") != target_fps or report.get("backend") not in MEDIAPIPE_BACKENDS:
+        return None
+    return report
+
+def save_calibration(path: Path, report: Dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
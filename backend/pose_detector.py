@@ -1,57 +1,157 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-from typing import List, Tuple
-
-class PoseDetector:
-    """MediaPipe BlazePose detector for real-time pose estimation"""
-    
-    def __init__(self):
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            smooth_landmarks=True,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
-    
-    def detect(self, frame):
-        """Detect pose landmarks in frame"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb_frame)
-        return results
-    
-    def get_landmarks(self, results) -> List[Tuple[float, float, float]]:
-        """Extract landmarks as (x, y, confidence) tuples"""
-        if not results.pose_landmarks:
-            return []
-        
-        landmarks = []
-        for landmark in results.pose_landmarks.landmark:
-            landmarks.append((landmark.x, landmark.y, landmark.visibility))
-        return landmarks
-    
-    def calculate_angle(self, p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple[float, float]) -> float:
-        """Calculate angle between three points"""
-        a = np.array(p1)
-        b = np.array(p2)
-        c = np.array(p3)
-        
-        ba = a - b
-        bc = c - b
-        
-        cos_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
-        angle = np.arccos(np.clip(cos_angle, -1, 1))
-        return np.degrees(angle)
-    
-    def draw_skeleton(self, frame, results):
-        """Draw pose skeleton on frame"""
-        if results.pose_landmarks:
-            self.mp_drawing.draw_landmarks(
-                frame,
-                results.pose_landmarks,
-                self.mp_pose.POSE_CONNECTIONS
-            )
-        return frame
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+from pose_backends import POSE_CONNECTIONS, MediaPipeBackend, PoseBackend
+
+class PoseDetector:
+    """Real-time pose estimation on top of a pluggable PoseBackend (MediaPipe BlazePose by default)"""
+    
+    def __init__(self, backend: Optional[PoseBackend] = None, roi_tracking: bool = False, roi_margin: float = 0.25, roi_max_side: int = 256, roi_min_visibility: float = 0.5):
+        self.backend = backend or MediaPipeBackend(model_complexity=1)
+        # Opt-in: MediaPipe's video graph already tracks the person between
+        # frames, and its crops run on a static graph that detects again, so
+        # cropping isn't shown to be cheaper
+        self.roi_tracking = roi_tracking
+        self.roi_margin = roi_margin
+        self.roi_max_side = roi_max_side
+        self.roi_min_visibility = roi_min_visibility
+        self.roi = None  # (x0, y0, x1, y1) in pixels, from the previous frame
+    
+    def set_backend(self, backend: PoseBackend):
+        """Swap the pose model (e.g. after calibration); the old one is closed"""
+        old, self.backend = self.backend, backend
+        self.roi = None
+        if old is not backend:
+            old.close()
+    
+    def detect(self, frame):
+        """Detect pose landmarks in frame"""
+        roi_tracking = self.roi_tracking and self.backend.supports_roi
+        if roi_tracking and self.roi is not None:
+            results = self._detect_roi(frame)
+            if results is not None:
+                return results
+        
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.backend.process(rgb_frame)
+        if roi_tracking:
+            self.roi = self._next_roi(results, frame.shape)
+        return results
+    
+    def _detect_roi(self, frame):
+        """Detect on the previous frame's person crop
+        
+        A miss clears the ROI and returns None, so detect() falls back to the
+        full frame instead of dropping it.
+        """
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        crop = frame[y0:y1, x0:x1]
+        
+        scale = self.roi_max_side / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        results = self.backend.process_crop(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        if not results.pose_landmarks:
+            self.roi = None
+            return None
+        
+        visibility = np.mean([lm.visibility for lm in results.pose_landmarks.landmark])
+        if visibility < self.roi_min_visibility:
+            self.roi = None
+            return None
+        
+        # Map crop-normalized coordinates back to full-frame normalized coordinates
+        for lm in results.pose_landmarks.landmark:
+            lm.x = (x0 + lm.x * (x1 - x0)) / w
+            lm.y = (y0 + lm.y * (y1 - y0)) / h
+        
+        self.roi = self._next_roi(results, frame.shape)
+        return results
+    
+    def _next_roi(self, results, shape):
+        """Bounding box of visible landmarks plus margin, in pixels"""
+        if not results.pose_landmarks:
+            return None
+        
+        h, w = shape[:2]
+        points = np.array([(lm.x, lm.y) for lm in results.pose_landmarks.landmark if lm.visibility >= self.roi_min_visibility])
+        if len(points) < 2:
+            return None
+        
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+        margin_x = (max_x - min_x) * self.roi_margin
+        margin_y = (max_y - min_y) * self.roi_margin
+        x0 = int(max(0, (min_x - margin_x) * w))
+        y0 = int(max(0, (min_y - margin_y) * h))
+        x1 = int(min(w, (max_x + margin_x) * w))
+        y1 = int(min(h, (max_y + margin_y) * h))
+        
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        return (x0, y0, x1, y1)
+    
+    def reset_tracking(self):
+        """Force the next detection to use the full frame and drop the model's tracking state"""
+        self.roi = None
+        self.backend.reset()
+    
+    @staticmethod
+    def get_landmarks(results) -> List[Tuple[float, float, float]]:
+        """Extract landmarks as (x, y, confidence) tuples"""
+        if not results.pose_landmarks:
+            return []
+        
+        landmarks = []
+        for landmark in results.pose_landmarks.landmark:
+            landmarks.append((landmark.x, landmark.y, landmark.visibility))
+        return landmarks
+    
+    @staticmethod
+    def calculate_angle(p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple[float, float]) -> float:
+        """Calculate angle between three points"""
+        a = np.array(p1)
+        b = np.array(p2)
+        c = np.array(p3)
+        
+        ba = a - b
+        bc = c - b
+        
+        cos_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
+        angle = np.arccos(np.clip(cos_angle, -1, 1))
+        return np.degrees(angle)
+    
+    @staticmethod
+    def calculate_angles(points: np.ndarray, triplets: np.ndarray) -> np.ndarray:
+        """Calculate the angle at the middle point of every (a, b, c) index triplet at once"""
+        joints = points[triplets]
+        ba = joints[:, 0] - joints[:, 1]
+        bc = joints[:, 2] - joints[:, 1]
+        
+        cos_angle = np.sum(ba * bc, axis=1) / (np.linalg.norm(ba, axis=1) * np.linalg.norm(bc, axis=1) + 1e-6)
+        return np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
+    
+    def draw_landmarks(self, frame, landmarks, min_visibility: float = 0.5):
+        """Draw skeleton from an (N, 3) array of normalized (x, y, visibility) landmarks"""
+        if landmarks is None:
+            return frame
+        
+        h, w = frame.shape[:2]
+        landmarks = np.asarray(landmarks)
+        pixels = [tuple(p) for p in (landmarks[:, :2] * (w, h)).astype(int).tolist()]
+        visible = (landmarks[:, 2] >= min_visibility).tolist()
+        
+        for start, end in POSE_CONNECTIONS:
+            if visible[start] and visible[end]:
+                cv2.line(frame, pixels[start], pixels[end], (224, 224, 224), 2)
+        for point, is_visible in zip(pixels, visible):
+            if is_visible:
+                cv2.circle(frame, point, 3, (0, 0, 255), -1)
+        return frame
+    
+    def draw_skeleton(self, frame, results):
+        """Draw pose skeleton on frame"""
+        if results.pose_landmarks:
+            self.draw_landmarks(frame, self.get_landmarks(results))
+        return frame
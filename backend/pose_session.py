@@ -1,98 +1,139 @@
-import cv2
-import json
-from datetime import datetime
-from typing import Dict, Tuple, List
-from pose_detector import PoseDetector
-from exercise_engine import ExerciseEngine
-import requests
-
-class PoseSession:
-    """Manages real-time pose detection session with posture tracking"""
-    
-    def __init__(self, user_id: int, exercise_id: int, exercise_config: Dict, backend_url: str = "http://localhost:8000"):
-        self.user_id = user_id
-        self.exercise_id = exercise_id
-        self.detector = PoseDetector()
-        self.engine = ExerciseEngine(exercise_config)
-        self.backend_url = backend_url
-        self.start_time = datetime.now()
-        self.frame_count = 0
-        self.all_metrics = []
-        self.all_posture_errors = []
-    
-    def process_frame(self, frame) -> Tuple[any, Dict, List[str]]:
-        """Process single frame, return annotated frame, metrics, and posture errors"""
-        results = self.detector.detect(frame)
-        metrics, posture_errors = self.engine.process_frame(frame, results)
-        
-        self.all_metrics.append(metrics)
-        self.all_posture_errors.append(posture_errors)
-        self.frame_count += 1
-        
-        # Draw visualization
-        annotated_frame = self.detector.draw_skeleton(frame.copy(), results)
-        self._draw_metrics(annotated_frame, metrics, posture_errors)
-        
-        return annotated_frame, metrics, posture_errors
-    
-    def _draw_metrics(self, frame, metrics: Dict, posture_errors: List[str]):
-        """Draw metrics overlay on frame"""
-        h, w, _ = frame.shape
-        
-        # Rep count (large, prominent)
-        cv2.putText(frame, f"Reps: {metrics['reps']}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-        
-        # Speed and ROM
-        cv2.putText(frame, f"Speed: {metrics['avg_speed']:.3f}", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        cv2.putText(frame, f"ROM: {metrics['avg_rom']:.1f}°", (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        
-        # Fatigue indicator
-        if metrics['fatigue_detected']:
-            cv2.putText(frame, "⚠ FATIGUE DETECTED", (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-        
-        # Posture status
-        if posture_errors:
-            posture_text = "✗ " + posture_errors[0].replace("_", " ").title()
-            cv2.putText(frame, posture_text, (10, 190), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
-        else:
-            cv2.putText(frame, "✓ Posture OK", (10, 190), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-    
-    def end_session(self) -> Dict:
-        """End session and save to backend"""
-        duration = (datetime.now() - self.start_time).total_seconds()
-        
-        # Calculate averages
-        avg_speed = sum(m['avg_speed'] for m in self.all_metrics) / len(self.all_metrics) if self.all_metrics else 0
-        avg_rom = sum(m['avg_rom'] for m in self.all_metrics) / len(self.all_metrics) if self.all_metrics else 0
-        fatigue_detected = any(m['fatigue_detected'] for m in self.all_metrics)
-        
-        # Count total posture errors
-        posture_error_count = sum(1 for errors in self.all_posture_errors if errors)
-        
-        # Completion percentage (based on rep target)
-        completion = (self.engine.rep_count / 15) * 100  # Target is typically 15 reps
-        
-        summary = {
-            "total_reps": self.engine.rep_count,
-            "avg_speed": float(avg_speed),
-            "avg_rom": float(avg_rom),
-            "duration_seconds": float(duration),
-            "fatigue_detected": fatigue_detected,
-            "posture_errors": posture_error_count,
-            "completion_percentage": float(min(completion, 100))
-        }
-        
-        try:
-            requests.post(f"{self.backend_url}/sessions/save", json={
-                "patient_id": str(self.user_id),
-                "exercise_id": str(self.exercise_id),
-                "completion_percentage": summary['completion_percentage'],
-                "avg_speed": summary['avg_speed'],
-                "fatigue_detected": fatigue_detected,
-                "form_errors": posture_error_count,
-                "session_summary": summary
-            })
-        except Exception as e:
-            print(f"[v0] Session save error: {e}")  # Handle offline gracefully
-        
-        return summary
+import cv2
+import json
+import base64
+import time
+from datetime import datetime
+from typing import Dict, Tuple, List, Union
+from pose_detector import PoseDetector
+from exercise_config import ExerciseDefinition
+from exercise_engine import ExerciseEngine
+from landmark_predictor import LandmarkPredictor
+from metrics_buffer import MetricsBuffer
+from session_timeline import SessionTimeline
+import requests
+
+class PoseSession:
+    """Manages real-time pose detection session with posture tracking"""
+    
+    def __init__(self, user_id: int, exercise_id: int, exercise_config: Union[ExerciseDefinition, Dict], backend_url: str = "http://localhost:8000", inference_stride: int = 1, detector: PoseDetector = None):
+        self.user_id = user_id
+        self.exercise_id = exercise_id
+        # A pre-warmed detector can be shared across sessions to skip model loading
+        self.detector = detector or PoseDetector()
+        self.detector.reset_tracking()
+        self.engine = ExerciseEngine(exercise_config)
+        self.backend_url = backend_url
+        self.start_time = datetime.now()
+        self.frame_count = 0
+        self.metrics_buffer = MetricsBuffer()
+        self.timeline = SessionTimeline()
+        
+        # Run the model on every Nth frame; frames in between get a predicted skeleton
+        self.inference_stride = max(1, inference_stride)
+        self.predictor = LandmarkPredictor()
+        self.last_metrics = None
+        self.last_posture_errors = []
+    
+    def process_frame(self, frame, timestamp: float = None) -> Tuple[any, Dict, List[str]]:
+        """Process single frame, return annotated frame, metrics, and posture errors"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
+        if self.last_metrics is not None and self.frame_count % self.inference_stride != 0:
+            return self._predict_frame(frame, timestamp)
+        
+        results = self.detector.detect(frame)
+        landmarks = self.detector.get_landmarks(results)
+        metrics, posture_errors = self.engine.process_landmarks(landmarks, timestamp)
+        self.predictor.update(landmarks, timestamp)
+        
+        self.metrics_buffer.append(metrics, posture_errors)
+        self.timeline.append(timestamp, metrics, posture_errors)
+        self.last_metrics = metrics
+        self.last_posture_errors = posture_errors
+        self.frame_count += 1
+        
+        # Draw visualization
+        annotated_frame = self.detector.draw_skeleton(frame.copy(), results)
+        self._draw_metrics(annotated_frame, metrics, posture_errors)
+        
+        return annotated_frame, metrics, posture_errors
+    
+    def _predict_frame(self, frame, timestamp: float) -> Tuple[any, Dict, List[str]]:
+        """Fill in a frame skipped by inference with landmarks extrapolated to its timestamp"""
+        self.frame_count += 1
+        
+        annotated_frame = self.detector.draw_landmarks(frame.copy(), self.predictor.predict(timestamp))
+        self._draw_metrics(annotated_frame, self.last_metrics, self.last_posture_errors)
+        
+        return annotated_frame, self.last_metrics, self.last_posture_errors
+    
+    def _draw_metrics(self, frame, metrics: Dict, posture_errors: List[str]):
+        """Draw metrics overlay on frame"""
+        h, w, _ = frame.shape
+        
+        # Rep count (large, prominent)
+        cv2.putText(frame, f"Reps: {metrics['reps']}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
+        
+        # Speed and ROM
+        cv2.putText(frame, f"Speed: {metrics['avg_speed']:.3f}", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        cv2.putText(frame, f"ROM: {metrics['avg_rom']:.1f}°", (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        
+        # Fatigue indicator
+        if metrics['fatigue_detected']:
+            cv2.putText(frame, "⚠ FATIGUE DETECTED", (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        
+        # Posture status
+        if posture_errors:
+            posture_text = "✗ " + posture_errors[0].replace("_", " ").title()
+            cv2.putText(frame, posture_text, (10, 190), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+        else:
+            cv2.putText(frame, "✓ Posture OK", (10, 190), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    
+    def end_session(self) -> Dict:
+        """End session and save to backend"""
+        duration = (datetime.now() - self.start_time).total_seconds()
+        
+        # Calculate averages
+        avg_speed = self.metrics_buffer.mean("avg_speed")
+        avg_rom = self.metrics_buffer.mean("avg_rom")
+        fatigue_detected = self.metrics_buffer.any("fatigue_detected")
+        
+        # Count total posture errors
+        posture_error_count = self.metrics_buffer.frames_with_errors()
+        
+        # Per-side reps and left/right asymmetry as of the last frame
+        final_metrics = self.last_metrics or {}
+        
+        # Completion percentage (based on rep target)
+        completion = (self.engine.rep_count / self.engine.exercise.target_reps) * 100
+        
+        summary = {
+            "total_reps": self.engine.rep_count,
+            "avg_speed": float(avg_speed),
+            "avg_rom": float(avg_rom),
+            "duration_seconds": float(duration),
+            "fatigue_detected": fatigue_detected,
+            "posture_errors": posture_error_count,
+            "completion_percentage": float(min(completion, 100)),
+            "side_reps": final_metrics.get("side_reps", {}),
+            "angle_asymmetry": final_metrics.get("angle_asymmetry", 0.0),
+            "posture_error_breakdown": self.metrics_buffer.error_counts(),
+            "rep_records": self.engine.rep_records
+        }
+        
+        try:
+            requests.post(f"{self.backend_url}/sessions/save", json={
+                "patient_id": str(self.user_id),
+                "exercise_id": str(self.exercise_id),
+                "completion_percentage": summary['completion_percentage'],
+                "avg_speed": summary['avg_speed'],
+                "fatigue_detected": fatigue_detected,
+                "form_errors": posture_error_count,
+                "session_summary": summary,
+                "timeline": base64.b64encode(self.timeline.encode()).decode("ascii")
+            })
+        except Exception as e:
+            print(f"[v0] Session save error: {e}")  # Handle offline gracefully
+        
+        return summary
@@ -0,0 +1,109 @@
+import numpy as np
+from typing import Dict, List
+
+# Rules used when an exercise config doesn't define its own "posture_rules".
+# Each rule compares the mean of landmarks "a" minus the mean of landmarks "b"
+# (or just "a" when "b" is omitted) along one axis against a threshold.
+DEFAULT_POSTURE_RULES = [
+    {"error": "shoulders_uneven", "a": [11], "b": [12], "axis": "y", "compare": "abs>", "threshold": 0.1},
+    {"error": "back_not_straight", "a": [0], "b": [23, 24], "axis": "x", "compare": "abs>", "threshold": 0.15},
+    {"error": "hip_misaligned", "a": [23], "b": [24], "axis": "y", "compare": "abs>", "threshold": 0.1},
+    {"error": "knee_not_aligned", "a": [25], "b": [26], "axis": "y", "compare": "abs>", "threshold": 0.12},
+    {"error": "neck_position", "a": [0], "axis": "y", "compare": "<", "threshold": 0.1},
+]
+
+AXES = {"x": 0, "y": 1}
+COMPARISONS = {">": (False, 1.0), "<": (False, -1.0), "abs>": (True, 1.0), "abs<": (True, -1.0)}
+
+def _is_index(value) -> bool:
+    # bool is an int subclass, but True/False are never meant as landmark indices
+    return isinstance(value, int) and not isinstance(value, bool)
+
+class PostureRules:
+    """Posture rules compiled into index arrays and evaluated as one NumPy expression"""
+    
+    def __init__(self, rules: List[Dict], num_landmarks: int = 33):
+        if not isinstance(rules, (list, tuple)):
+            raise ValueError("posture_rules must be a list of rules")
+        self.errors = []
+        self.num_landmarks = num_landmarks
+        self.required_landmarks = 0
+        
+        count = len(rules)
+        # Each row of the weight matrix averages "a" and subtracts the average of "b"
+        self.weights = np.zeros((count, num_landmarks))
+        self.axis = np.zeros(count, dtype=np.intp)
+        self.use_abs = np.zeros(count, dtype=bool)
+        self.sign = np.ones(count)
+        self.threshold = np.zeros(count)
+        
+        for i, rule in enumerate(rules):
+            self._compile_rule(i, rule)
+        
+        self.rows = np.arange(count)
+        self.signed_threshold = self.sign * self.threshold
+        
+        # Compiled rules are shared by every session of an exercise; keep them read-only
+        self.errors = tuple(self.errors)
+        for array in (self.weights, self.axis, self.use_abs, self.sign, self.threshold, self.rows, self.signed_threshold):
+            array.setflags(write=False)
+    
+    def _compile_rule(self, i: int, rule: Dict):
+        """Validate one rule and write it into row i of the index arrays"""
+        if not isinstance(rule, dict):
+            raise ValueError(f"Posture rule {i} must be an object")
+        name = rule.get("error")
+        if not name or not isinstance(name, str):
+            raise ValueError(f"Posture rule {i} has no 'error' name")
+        
+        a = rule.get("a", [])
+        b = rule.get("b", [])
+        if not isinstance(a, list) or not isinstance(b, list) or not a:
+            raise ValueError(f"Posture rule '{name}' landmarks 'a' and 'b' must be lists of indices")
+        if any(not _is_index(idx) or not 0 <= idx < self.num_landmarks for idx in a + b):
+            raise ValueError(f"Posture rule '{name}' landmark indices must be integers in [0, {self.num_landmarks})")
+        if rule.get("axis") not in AXES:
+            raise ValueError(f"Posture rule '{name}' axis must be one of {list(AXES)}")
+        if rule.get("compare") not in COMPARISONS:
+            raise ValueError(f"Posture rule '{name}' compare must be one of {list(COMPARISONS)}")
+        
+        np.add.at(self.weights[i], a, 1.0 / len(a))
+        if b:
+            np.add.at(self.weights[i], b, -1.0 / len(b))
+        
+        self.errors.append(name)
+        self.required_landmarks = max(self.required_landmarks, max(a + b) + 1)
+        self.axis[i] = AXES[rule["axis"]]
+        self.use_abs[i], self.sign[i] = COMPARISONS[rule["compare"]]
+        threshold = rule.get("threshold", 0)
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not np.isfinite(threshold):
+            raise ValueError(f"Posture rule '{name}' threshold must be a number")
+        self.threshold[i] = threshold
+    
+    def evaluate(self, landmarks) -> List[str]:
+        """Return the names of all rules violated by (x, y, visibility) landmarks"""
+        if not self.errors:
+            return []
+        
+        if len(landmarks) < self.required_landmarks:
+            return []
+        
+        points = np.zeros((self.num_landmarks, 2))
+        count = min(len(landmarks), self.num_landmarks)
+        points[:count] = np.asarray(landmarks, dtype=np.float64)[:count, :2]
+        
+        values = (self.weights @ points)[self.rows, self.axis]
+        values = np.where(self.use_abs, np.abs(values), values)
+        violated = self.sign * values > self.signed_threshold
+        return [self.errors[i] for i in np.flatnonzero(violated)]
+    
+    def evaluate_frames(self, points: np.ndarray) -> np.ndarray:
+        """Vectorized evaluate over (frames, landmarks, 2+) points; returns a (frames, rules) violation mask"""
+        points = np.asarray(points, dtype=np.float64)
+        if not self.errors or points.shape[1] < self.required_landmarks:
+            return np.zeros((len(points), len(self.errors)), dtype=bool)
+        
+        count = min(points.shape[1], self.num_landmarks)
+        values = np.einsum("rl,fla->fra", self.weights[:, :count], points[:, :count, :2])[:, self.rows, self.axis]
+        values = np.where(self.use_abs, np.abs(values), values)
+        return self.sign * values > self.signed_threshold
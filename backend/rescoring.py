@@ -0,0 +1,239 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from exercise_config import ExerciseDefinition
+from session_timeline import decode_timeline
+from storage import load_json, save_json
+
+# Same cut-off ExerciseEngine uses to flag fatigue from per-rep ROM loss
+FATIGUE_ROM_REDUCTION = 15
+FATIGUE_MIN_SPEED = 0.01
+
+def score_angles(angles: np.ndarray, side_angles: np.ndarray, starts: np.ndarray, down_angle: float,
+                 up_angle: float) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Replay the rep state machine over many sessions' angle series at once
+    
+    `angles` (the mean angle) and `side_angles` (one column per side, NaN
+    where a side isn't recorded) are every session's series concatenated,
+    `starts` the index where each session begins. As in ExerciseEngine each
+    side starts down, goes up when its angle passes up_angle (that counts one
+    of its reps) and down again below down_angle; a session's rep count is
+    its best side's. A rep closes when no side is up any more, and its ROM is
+    the mean angle's range since the previous close. Returns (reps per
+    session, per-rep ROMs per session).
+    """
+    n = len(angles)
+    if n == 0:
+        return np.zeros(len(starts), dtype=int), [np.zeros(0) for _ in starts]
+    session = np.zeros(n, dtype=np.intp)
+    session[starts[1:]] = 1
+    session = np.cumsum(session)
+    
+    # Hysteresis as a forward fill per side: every sample takes the side's last
+    # threshold crossing at or before it, and a session start forgets the
+    # previous one. NaN never crosses, so an unrecorded side stays down.
+    event = np.where(side_angles > up_angle, 1, np.where(side_angles < down_angle, -1, 0))
+    is_start = np.zeros(n, dtype=bool)
+    is_start[starts] = True
+    last = np.where((event != 0) | is_start[:, None], np.arange(n)[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    is_up = np.take_along_axis(event, last, axis=0) == 1
+    
+    was_up = np.r_[np.zeros((1, is_up.shape[1]), dtype=bool), is_up[:-1]]
+    was_up[starts] = False
+    went_up = is_up & ~was_up
+    # Running rep count per side within each session; the session counts its best side
+    side_reps = np.cumsum(went_up, axis=0)
+    side_reps -= (side_reps - went_up)[starts][session]
+    counted = side_reps.max(axis=1)
+    reps = counted[np.r_[starts[1:], n] - 1]
+    
+    any_up = is_up.any(axis=1)
+    any_was_up = np.r_[False, any_up[:-1]]
+    any_was_up[starts] = False
+    closes = np.flatnonzero(~any_up & any_was_up)
+    
+    # Rep segments run from just after the previous close (or the session start)
+    # to the close; only closes that added to the count produce a rep, as in
+    # ExerciseEngine._close_rep_segment
+    bounds = np.unique(np.r_[starts, closes + 1])
+    bounds = bounds[bounds < n]
+    peaks = np.fmax.reduceat(angles, bounds)
+    troughs = np.fmin.reduceat(angles, bounds)
+    close_session = session[closes]
+    first_close = np.r_[True, close_session[1:] != close_session[:-1]]
+    before = np.where(first_close, 0, np.r_[0, counted[closes][:-1]])
+    closes = closes[counted[closes] > before]
+    segment = np.searchsorted(bounds, closes, side="right") - 1
+    roms = peaks[segment] - troughs[segment]
+    per_session = np.split(roms, np.searchsorted(session[closes], np.arange(1, len(starts))))
+    return reps, per_session
+
+def rom_reduction(roms: np.ndarray) -> float:
+    """Percent ROM lost from the first half of the reps to the second (needs 4+ reps), as in ExerciseEngine"""
+    if len(roms) < 4:
+        return 0.0
+    first_half = np.mean(roms[:len(roms) // 2])
+    second_half = np.mean(roms[len(roms) // 2:])
+    reduction = (first_half - second_half) / first_half * 100 if first_half > 0 else 0
+    return float(max(0, reduction))
+
+def rescore_chunk(timelines_dir: str, session_ids: List[str], down_angle: float, up_angle: float,
+                  sides: int = 1) -> Dict[str, Dict]:
+    """Worker: decode a batch of timelines and score them in one vectorized pass
+    
+    Sessions whose timeline is missing, unreadable or empty are left out. A
+    timeline without per-side angles (recorded before they were stored) is
+    replayed on its sampled mean angle, which can miss reps the engine
+    counted on one side; for exercises with two sides its score is marked
+    approximate.
+    """
+    series = []
+    side_series = []
+    approximate = []
+    scored_ids = []
+    for session_id in session_ids:
+        timeline_file = Path(timelines_dir) / f"{session_id}.bin"
+        try:
+            points, _ = decode_timeline(timeline_file.read_bytes())
+        except (OSError, ValueError):
+            continue
+        if not len(points):
+            continue
+        # Each point holds every side's two extremes since the previous point,
+        # in order; replay them as two samples
+        angle = np.repeat(points["angle"].astype(np.float64), 2)
+        side_angles = points["side_angles"].astype(np.float64).transpose(0, 2, 1).reshape(-1, points["side_angles"].shape[1])
+        recorded = not np.isnan(side_angles[0]).all()
+        if not recorded:
+            side_angles[:, 0] = angle
+        series.append(angle)
+        side_series.append(side_angles)
+        approximate.append(not recorded and sides > 1)
+        scored_ids.append(session_id)
+    if not series:
+        return {}
+    
+    starts = np.cumsum([0] + [len(s) for s in series[:-1]])
+    reps, roms = score_angles(np.concatenate(series), np.concatenate(side_series), starts, down_angle, up_angle)
+    return {
+        session_id: {"reps": int(r), "rom_reduction": round(rom_reduction(rep_roms), 2), "rep_roms": np.round(rep_roms, 1).tolist(),
+                     "approximate": is_approximate}
+        for session_id, r, rep_roms, is_approximate in zip(scored_ids, reps.tolist(), roms, approximate)
+    }
+
+def with_thresholds(exercise: Dict, down_angle: Optional[float] = None, up_angle: Optional[float] = None,
+                    target_reps: Optional[int] = None) -> Dict:
+    """Copy of an exercise record with threshold overrides applied, for what-if re-scoring"""
+    config = exercise.get("config_json", {})
+    if isinstance(config, str):
+        config = json.loads(config)
+    config = dict(config)
+    if down_angle is not None:
+        config["down_angle"] = down_angle
+    if up_angle is not None:
+        config["up_angle"] = up_angle
+    record = {**exercise, "config_json": config}
+    if target_reps is not None:
+        record["target_reps"] = target_reps
+    return record
+
+class Rescorer:
+    """Re-scores stored session timelines under an exercise definition and keeps each run's results
+    
+    Results go to <results_dir>/<exercise id>/<definition version>.json, so
+    every threshold setting tried keeps its own result set next to the
+    sessions' original scores, which are never modified.
+    """
+    
+    def __init__(self, timelines_dir: Path, results_dir: Path):
+        self.timelines_dir = timelines_dir
+        self.results_dir = results_dir
+    
+    def results_file(self, exercise_id: str, version: str) -> Path:
+        return self.results_dir / Path(str(exercise_id)).name / f"{Path(version).name}.json"
+    
+    def versions(self, exercise_id: str) -> List[Dict]:
+        """Summaries of every stored result set for an exercise, newest first"""
+        exercise_dir = self.results_dir / Path(str(exercise_id)).name
+        summaries = []
+        for results_file in exercise_dir.glob("*.json"):
+            results = load_json(results_file)
+            summaries.append({key: value for key, value in results.items() if key != "sessions"})
+        return sorted(summaries, key=lambda s: s.get("created_at", ""), reverse=True)
+    
+    def load(self, exercise_id: str, version: str) -> Optional[Dict]:
+        results_file = self.results_file(exercise_id, version)
+        return load_json(results_file) if results_file.exists() else None
+    
+    def rescore(self, definition: ExerciseDefinition, sessions: Iterable[Dict], processes: Optional[int] = None,
+                chunk_size: int = 200, progress: Optional[Callable[[float, str], None]] = None) -> Dict:
+        """Re-score the definition's exercise sessions across a process pool and save the result set"""
+        records = {}
+        exercise_sessions = set()
+        for session in sessions:
+            if str(session.get("exercise_id")) != definition.exercise_id:
+                continue
+            # A session can be in both the archive and the hot file; count it once
+            exercise_sessions.add(str(session.get("id")))
+            if session.get("timeline_points"):
+                records[str(session.get("id"))] = session
+        session_ids = list(records)
+        chunks = [session_ids[i:i + chunk_size] for i in range(0, len(session_ids), chunk_size)]
+        
+        scored = {}
+        if chunks:
+            processes = processes or min(len(chunks), os.cpu_count() or 1)
+            # spawn: forking a threaded server process is unsafe
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+                futures = [pool.submit(rescore_chunk, str(self.timelines_dir), chunk, definition.down_angle, definition.up_angle,
+                                       len(definition.sides))
+                           for chunk in chunks]
+                for done, future in enumerate(as_completed(futures), 1):
+                    scored.update(future.result())
+                    if progress:
+                        progress(done / len(futures), f"{len(scored)} of {len(session_ids)} sessions re-scored")
+        
+        results = {}
+        changed = 0
+        approximate = 0
+        for session_id, score in scored.items():
+            session = records[session_id]
+            original_reps = session.get("session_summary", {}).get("total_reps")
+            avg_speed = session.get("avg_speed") or 0.0
+            results[session_id] = {
+                **score,
+                "completion_percentage": round(min(score["reps"] / definition.target_reps * 100, 100), 2),
+                "fatigue_detected": score["rom_reduction"] > FATIGUE_ROM_REDUCTION or avg_speed < FATIGUE_MIN_SPEED,
+                "original_reps": original_reps,
+                "original_completion_percentage": session.get("completion_percentage"),
+            }
+            # An approximate score can differ from the original count at unchanged
+            # thresholds, so it isn't evidence that the thresholds changed anything
+            if score["approximate"]:
+                approximate += 1
+            else:
+                changed += original_reps != score["reps"]
+        
+        summary = {
+            "exercise_id": definition.exercise_id,
+            "version": definition.version,
+            "down_angle": definition.down_angle,
+            "up_angle": definition.up_angle,
+            "target_reps": definition.target_reps,
+            "created_at": datetime.now().isoformat(),
+            "sessions_rescored": len(results),
+            "sessions_without_timeline": len(exercise_sessions) - len(results),
+            "sessions_approximate": approximate,
+            "rep_counts_changed": changed,
+        }
+        results_file = self.results_file(definition.exercise_id, definition.version)
+        results_file.parent.mkdir(parents=True, exist_ok=True)
+        save_json(results_file, {**summary, "sessions": results}, indent=None)
+        return summary
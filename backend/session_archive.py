@@ -0,0 +1,123 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from storage import file_lock, iter_json_array, load_json, save_bytes, save_json, update_json
+
+def session_brief(session: Dict) -> Dict:
+    """The fields the patient roster shows for a patient's latest session"""
+    return {key: session.get(key) for key in ("id", "exercise_id", "completion_percentage", "fatigue_detected", "created_at")}
+
+class SessionArchive:
+    """Cold tier: old sessions in gzip JSON-lines segments, one per month, listed in a manifest
+    
+    The manifest records each segment's time range and patients so readers can
+    skip segments that can't match, plus per-patient archived counts and latest
+    session for the roster.
+    """
+    
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = archive_dir
+        self.manifest_file = archive_dir / "manifest.json"
+    
+    def manifest(self) -> Dict:
+        manifest = load_json(self.manifest_file) if self.manifest_file.exists() else {}
+        return manifest if isinstance(manifest, dict) else {}
+    
+    def read_segment(self, file_name: str) -> Iterator[Dict]:
+        with gzip.open(self.archive_dir / file_name, "rt") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def _write_segment(self, file_name: str, sessions: List[Dict]):
+        lines = "".join(json.dumps(session) + "\n" for session in sessions)
+        save_bytes(self.archive_dir / file_name, gzip.compress(lines.encode(), 6))
+    
+    def segments(self, start: Optional[str] = None, end: Optional[str] = None,
+                 patient_id: Optional[str] = None) -> List[Dict]:
+        """Manifest entries of the segments that can hold sessions created in [start, end) for patient_id"""
+        return [segment for segment in self.manifest().get("segments", [])
+                if not (start and segment["end"] < start)
+                and not (end and segment["start"] >= end)
+                and (patient_id is None or patient_id in segment["patients"])]
+    
+    def iter_sessions(self, start: Optional[str] = None, end: Optional[str] = None,
+                      patient_id: Optional[str] = None) -> Iterator[Dict]:
+        """Archived sessions created in [start, end), opening only segments that can contain matches"""
+        for segment in self.segments(start, end, patient_id):
+            for session in self.read_segment(segment["file"]):
+                created_at = session.get("created_at", "")
+                if start and created_at < start:
+                    continue
+                if end and created_at >= end:
+                    continue
+                if patient_id is not None and session.get("patient_id") != patient_id:
+                    continue
+                yield session
+    
+    def archive(self, sessions_file: Path, older_than_days: int, now: Optional[datetime] = None,
+                progress: Optional[Callable[[float, str], None]] = None) -> Dict:
+        """Move sessions older than older_than_days from sessions_file into monthly segments
+        
+        Segments and the manifest are written before the hot file is trimmed, so
+        a crash in between leaves sessions in both tiers rather than losing them;
+        the next run skips ids a segment already holds.
+        """
+        cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).isoformat()
+        
+        # Cheap streaming check first so a no-op run doesn't rewrite the hot file
+        if not any(s.get("created_at", "") < cutoff for s in iter_json_array(sessions_file)):
+            return {"archived": 0, "months": [], "cutoff": cutoff}
+        
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with update_json(sessions_file) as sessions, file_lock(self.manifest_file):
+            cold = [s for s in sessions if s.get("created_at", "") < cutoff]
+            by_month = {}
+            for session in cold:
+                by_month.setdefault(session.get("created_at", "")[:7] or "undated", []).append(session)
+            
+            manifest = self.manifest()
+            segments = {segment["month"]: segment for segment in manifest.get("segments", [])}
+            patients = manifest.get("patients", {})
+            
+            for done, (month, new_sessions) in enumerate(sorted(by_month.items())):
+                if progress:
+                    progress(done / len(by_month), f"writing {month} ({done} of {len(by_month)} months)")
+                file_name = f"sessions-{month}.jsonl.gz"
+                existing = list(self.read_segment(file_name)) if month in segments else []
+                known_ids = {s.get("id") for s in existing}
+                added = [s for s in new_sessions if s.get("id") not in known_ids]
+                merged = sorted(existing + added, key=lambda s: s.get("created_at", ""))
+                self._write_segment(file_name, merged)
+                
+                segments[month] = {
+                    "month": month,
+                    "file": file_name,
+                    "count": len(merged),
+                    "start": merged[0].get("created_at", ""),
+                    "end": merged[-1].get("created_at", ""),
+                    "patients": sorted({s.get("patient_id") for s in merged if s.get("patient_id") is not None}),
+                }
+                self._add_patients(patients, added)
+            
+            save_json(self.manifest_file, {
+                "archived_before": max(manifest.get("archived_before", ""), cutoff),
+                "segments": [segments[month] for month in sorted(segments)],
+                "patients": patients,
+            })
+            sessions[:] = [s for s in sessions if s.get("created_at", "") >= cutoff]
+        
+        return {"archived": len(cold), "months": sorted(by_month), "cutoff": cutoff}
+    
+    @staticmethod
+    def _add_patients(patients: Dict, sessions: Iterable[Dict]):
+        for session in sessions:
+            patient_id = session.get("patient_id")
+            if patient_id is None:
+                continue
+            entry = patients.setdefault(patient_id, {"count": 0, "latest": None})
+            entry["count"] += 1
+            if entry["latest"] is None or session.get("created_at", "") >= entry["latest"].get("created_at", ""):
+                entry["latest"] = session_brief(session)
@@ -0,0 +1,136 @@
+import csv
+import io
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+from storage import iter_json_array
+
+# (column, getter, pyarrow type name) - flat per-session fields for research and billing
+EXPORT_COLUMNS = [
+    ("session_id", lambda s: s.get("id"), "string"),
+    ("patient_id", lambda s: s.get("patient_id"), "string"),
+    ("exercise_id", lambda s: s.get("exercise_id"), "string"),
+    ("created_at", lambda s: s.get("created_at"), "string"),
+    ("completion_percentage", lambda s: s.get("completion_percentage"), "float64"),
+    ("avg_speed", lambda s: s.get("avg_speed"), "float64"),
+    ("avg_rom", lambda s: s.get("session_summary", {}).get("avg_rom"), "float64"),
+    ("total_reps", lambda s: s.get("session_summary", {}).get("total_reps"), "int64"),
+    ("duration_seconds", lambda s: s.get("session_summary", {}).get("duration_seconds"), "float64"),
+    ("fatigue_detected", lambda s: s.get("fatigue_detected"), "bool"),
+    ("form_errors", lambda s: s.get("form_errors"), "int64"),
+    ("timeline_points", lambda s: s.get("timeline_points", 0), "int64"),
+]
+EXPORT_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+def created_at_bound(value: Union[str, datetime, None]) -> Optional[str]:
+    """A start/end filter in the form stored created_at values compare against
+    
+    Sessions are stamped with naive local time, so timezone-aware bounds are
+    converted to local time first. Strings must be ISO dates or timestamps
+    (ValueError otherwise).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+def filter_sessions(sessions: Iterable[Dict], start: Optional[str] = None, end: Optional[str] = None,
+                    patient_id: Optional[str] = None, exercise_id: Optional[str] = None) -> Iterator[Dict]:
+    """Sessions matching the filters; start is inclusive, end exclusive (naive ISO timestamps, see created_at_bound)"""
+    for session in sessions:
+        created_at = session.get("created_at", "")
+        if start and created_at < start:
+            continue
+        if end and created_at >= end:
+            continue
+        if patient_id is not None and session.get("patient_id") != patient_id:
+            continue
+        if exercise_id is not None and session.get("exercise_id") != exercise_id:
+            continue
+        yield session
+
+def iter_sessions(sessions_file: Path, start: Optional[str] = None, end: Optional[str] = None,
+                  patient_id: Optional[str] = None, exercise_id: Optional[str] = None) -> Iterator[Dict]:
+    """Stream matching sessions from a sessions file without loading it"""
+    return filter_sessions(iter_json_array(sessions_file), start, end, patient_id, exercise_id)
+
+def export_rows(sessions: Iterable[Dict]) -> Iterator[list]:
+    for session in sessions:
+        yield [getter(session) for _, getter, _ in EXPORT_COLUMNS]
+
+def iter_csv(sessions: Iterable[Dict], batch_rows: int = 1000) -> Iterator[bytes]:
+    """Encode sessions as CSV, yielding one chunk per batch_rows rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in EXPORT_COLUMNS])
+    for i, row in enumerate(export_rows(sessions), 1):
+        writer.writerow(row)
+        if i % batch_rows == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller instead of keeping them"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_parquet(sessions: Iterable[Dict], batch_rows: int = 10000) -> Iterator[bytes]:
+    """Encode sessions as Parquet, one row group per batch_rows rows
+    
+    Requires pyarrow; raises ImportError right away (not on first chunk) when
+    it isn't installed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return _parquet_chunks(pa, pq, sessions, batch_rows)
+
+def _parquet_chunks(pa, pq, sessions: Iterable[Dict], batch_rows: int) -> Iterator[bytes]:
+    schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, _, type_name in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    
+    def flush(rows):
+        columns = zip(*rows)
+        writer.write_table(pa.table([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+        return sink.drain()
+    
+    rows = []
+    for row in export_rows(sessions):
+        rows.append(row)
+        if len(rows) == batch_rows:
+            yield flush(rows)
+            rows = []
+    if rows:
+        yield flush(rows)
+    writer.close()
+    yield sink.drain()
+
+def iter_export(sessions: Iterable[Dict], export_format: str) -> Iterator[bytes]:
+    if export_format == "csv":
+        return iter_csv(sessions)
+    if export_format == "parquet":
+        return iter_parquet(sessions)
+    raise ValueError(f"Unsupported export format: {export_format}")
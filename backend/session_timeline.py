@@ -0,0 +1,199 @@
+import json
+import struct
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
+
+# Blob layout: header, JSON list of posture error names, then zlib-compressed
+# int32 columns. t/angle/speed/reps and each recorded side's angle extremes
+# are quantized and delta-encoded; posture flags are stored as-is (they're
+# mostly zero and compress well). Side extremes are rounded outward (lows
+# down, highs up) so a pass over a threshold on the 0.1 degree grid survives
+# quantization. CTL1 blobs predate the side angles.
+TIMELINE_MAGIC = b"CTL2"
+TIMELINE_HEADER = struct.Struct("<4sIII")  # magic, point count, names length, side count
+TIMELINE_V1_MAGIC = b"CTL1"
+TIMELINE_V1_HEADER = struct.Struct("<4sII")
+MAX_SIDES = 2
+ANGLE_SCALE = 10  # 0.1 degree
+SPEED_SCALE = 10000
+# Blobs come from clients; cap what a header may claim (~29 h at 10 Hz)
+MAX_TIMELINE_POINTS = 1 << 20
+
+TIMELINE_DTYPE = np.dtype([
+    ("t", np.int32),  # ms since session start
+    ("angle", np.float32),
+    ("speed", np.float32),
+    ("reps", np.int32),
+    ("flags", np.int32),  # bit i set = posture_errors[i] present
+    # Per side, the lowest and highest angle since the previous point in the
+    # order they occurred, so the rep counter can be replayed; NaN if not recorded.
+    # Full precision until encoded, like the engine compares them
+    ("side_angles", np.float64, (MAX_SIDES, 2)),
+])
+
+class SessionTimeline:
+    """Downsampled per-session timeline of angle, speed, reps, per-side angles and posture flags"""
+    
+    def __init__(self, interval_ms: int = 100, capacity: int = 1024):
+        self.interval_ms = interval_ms
+        self.data = np.zeros(capacity, dtype=TIMELINE_DTYPE)
+        self.size = 0
+        self.sides = 0
+        self.posture_errors = []
+        self.dropped_errors = set()  # names past the 31-bit flag mask, not recorded
+        self.start_time = None
+        self.flags = 0
+        self.pending = None
+    
+    def append(self, timestamp: float, metrics: Dict, posture_errors: List[str]):
+        """Record a frame, keeping at most one point per interval"""
+        if self.start_time is None:
+            self.start_time = timestamp
+            self.sides = min(len(metrics.get("side_angles", ())), MAX_SIDES)
+        t = int((timestamp - self.start_time) * 1000)
+        
+        # Posture flags seen since the last recorded point are OR-ed in so
+        # short-lived errors aren't lost by downsampling
+        for error in posture_errors:
+            if error not in self.posture_errors:
+                if len(self.posture_errors) == 31:
+                    if error not in self.dropped_errors:
+                        self.dropped_errors.add(error)
+                        print(f"[v0] Session timeline: more than 31 posture error types, not recording {error!r}")
+                    continue
+                self.posture_errors.append(error)
+            self.flags |= 1 << self.posture_errors.index(error)
+        
+        # Likewise each side's extremes, so a brief pass over a rep threshold
+        # between points still replays
+        side_angles = np.asarray(metrics.get("side_angles", ())[:self.sides], dtype=np.float64)
+        if self.pending is None:
+            self.pending = np.zeros(1, dtype=TIMELINE_DTYPE)[0]
+            self.pending["side_angles"] = np.nan
+            self.pending["side_angles"][:self.sides] = side_angles[:, None]
+        else:
+            extremes = self.pending["side_angles"][:self.sides]
+            low = extremes.min(axis=1)
+            high = extremes.max(axis=1)
+            # The new angle becomes the later extreme on the sides it extends
+            extremes[side_angles < low] = np.column_stack([high, side_angles])[side_angles < low]
+            extremes[side_angles > high] = np.column_stack([low, side_angles])[side_angles > high]
+        self.pending["t"], self.pending["angle"], self.pending["speed"] = t, metrics.get("angle", 0.0), metrics.get("speed", 0.0)
+        self.pending["reps"], self.pending["flags"] = metrics["reps"], self.flags
+        
+        if self.size and t - self.data["t"][self.size - 1] < self.interval_ms:
+            return
+        
+        if self.size == len(self.data):
+            grown = np.zeros(len(self.data) * 2, dtype=TIMELINE_DTYPE)
+            grown[:self.size] = self.data
+            self.data = grown
+        
+        self.data[self.size] = self.pending
+        self.size += 1
+        self.flags = 0
+        self.pending = None
+    
+    def encode(self) -> bytes:
+        points = self.data[:self.size]
+        if self.pending is not None:
+            # Frames after the last recorded point are the session's tail
+            points = np.append(points, self.pending)
+        return encode_timeline(points, self.posture_errors, self.sides)
+
+def encode_timeline(points: np.ndarray, posture_errors: List[str], sides: int = 0) -> bytes:
+    """Quantize, delta-encode and compress timeline points, keeping the first `sides` sides' angles"""
+    if not 0 <= sides <= MAX_SIDES:
+        raise ValueError(f"A timeline records at most {MAX_SIDES} sides")
+    columns = [
+        points["t"].astype(np.int64),
+        np.round(points["angle"] * ANGLE_SCALE).astype(np.int64),
+        np.round(points["speed"] * SPEED_SCALE).astype(np.int64),
+        points["reps"].astype(np.int64),
+    ] + [_quantize_extremes(points["side_angles"][:, side]) for side in range(sides)]
+    deltas = [np.diff(c, prepend=0) for c in columns] + [points["flags"].astype(np.int64)]
+    body = zlib.compress(np.concatenate(deltas).astype("<i4").tobytes(), 9)
+    names = json.dumps(posture_errors).encode()
+    return TIMELINE_HEADER.pack(TIMELINE_MAGIC, len(points), len(names), sides) + names + body
+
+def _quantize_extremes(pairs: np.ndarray) -> np.ndarray:
+    """(points, 2) low/high pairs, either order, as interleaved ints with each high rounded up and low rounded down"""
+    scaled = pairs.astype(np.float64) * ANGLE_SCALE
+    is_high = np.zeros(scaled.shape, dtype=bool)
+    is_high[np.arange(len(scaled)), np.argmax(scaled, axis=1)] = True
+    return np.where(is_high, np.ceil(scaled), np.floor(scaled)).astype(np.int64).ravel()
+
+def decode_timeline(blob: bytes):
+    """Decode a timeline blob into (points, posture error names)
+    
+    Side angles the blob doesn't record (all of them, for CTL1 blobs) are NaN.
+    """
+    magic = blob[:4]
+    if magic == TIMELINE_MAGIC and len(blob) >= TIMELINE_HEADER.size:
+        _, count, names_len, sides = TIMELINE_HEADER.unpack_from(blob)
+        offset = TIMELINE_HEADER.size
+    elif magic == TIMELINE_V1_MAGIC and len(blob) >= TIMELINE_V1_HEADER.size:
+        _, count, names_len = TIMELINE_V1_HEADER.unpack_from(blob)
+        offset, sides = TIMELINE_V1_HEADER.size, 0
+    else:
+        raise ValueError("Not a timeline blob")
+    if count > MAX_TIMELINE_POINTS:
+        raise ValueError(f"Timeline too long ({count} points)")
+    if sides > MAX_SIDES:
+        raise ValueError(f"Timeline has too many sides ({sides})")
+    
+    expected = count * (5 + 2 * sides) * 4
+    try:
+        posture_errors = json.loads(blob[offset:offset + names_len])
+        # Bounded so a small blob can't inflate into gigabytes
+        decompressor = zlib.decompressobj()
+        raw = decompressor.decompress(blob[offset + names_len:], expected)
+        extra = decompressor.decompress(decompressor.unconsumed_tail, 1)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt timeline blob: {e}")
+    if len(raw) != expected or extra or not decompressor.eof or decompressor.unused_data:
+        raise ValueError("Corrupt timeline blob")
+    raw = np.frombuffer(raw, dtype="<i4").astype(np.int64)
+    
+    columns = np.split(raw, np.cumsum([count] * 4 + [2 * count] * sides))
+    points = np.zeros(count, dtype=TIMELINE_DTYPE)
+    points["t"] = np.cumsum(columns[0])
+    points["angle"] = np.cumsum(columns[1]) / ANGLE_SCALE
+    points["speed"] = np.cumsum(columns[2]) / SPEED_SCALE
+    points["reps"] = np.cumsum(columns[3])
+    points["side_angles"] = np.nan
+    for side in range(sides):
+        points["side_angles"][:, side] = np.cumsum(columns[4 + side]).reshape(count, 2) / ANGLE_SCALE
+    points["flags"] = columns[-1]
+    return points, posture_errors
+
+def query_timeline(points: np.ndarray, start_ms: int = 0, end_ms: Optional[int] = None, resolution_ms: int = 0) -> Dict:
+    """Slice points to [start_ms, end_ms] and aggregate into resolution_ms buckets"""
+    lo = np.searchsorted(points["t"], start_ms, side="left")
+    hi = len(points) if end_ms is None else np.searchsorted(points["t"], end_ms, side="right")
+    window = points[lo:hi]
+    
+    previous_reps = points["reps"][lo - 1] if lo > 0 else 0
+    rep_events = window["t"][np.diff(window["reps"], prepend=previous_reps) > 0]
+    
+    if resolution_ms > 0 and len(window):
+        buckets = (window["t"] - start_ms) // resolution_ms
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        counts = np.diff(np.append(starts, len(window)))
+        t = start_ms + buckets[starts] * resolution_ms
+        angle = np.add.reduceat(window["angle"].astype(np.float64), starts) / counts
+        speed = np.add.reduceat(window["speed"].astype(np.float64), starts) / counts
+        reps = np.maximum.reduceat(window["reps"], starts)
+        flags = np.bitwise_or.reduceat(window["flags"], starts)
+    else:
+        t, angle, speed, reps, flags = window["t"], window["angle"], window["speed"], window["reps"], window["flags"]
+    
+    return {
+        "t": t.tolist(),
+        "angle": np.round(angle, 1).tolist(),
+        "speed": np.round(speed, 4).tolist(),
+        "reps": reps.tolist(),
+        "posture_flags": flags.tolist(),
+        "rep_events": rep_events.tolist(),
+    }
@@ -0,0 +1,211 @@
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+_SEPARATORS = re.compile(r"[\s,]*")
+_KEY_SEPARATOR = re.compile(r"\s*:?\s*")
+
+@contextmanager
+def file_lock(file_path: Path):
+    """Exclusive inter-process lock for file_path, held via a sidecar .lock file"""
+    lock_path = file_path.with_name(file_path.name + ".lock")
+    with open(lock_path, "a+") as lock_file:
+        if os.name == "nt":
+            while True:
+                try:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.01)  # LK_LOCK gives up after ~10s; keep waiting
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+# Data files holding a JSON object keyed by id/email; the rest hold arrays
+OBJECT_FILES = {"users.json", "jobs.json"}
+
+def default_for(file_path: Path):
+    return {} if file_path.name in OBJECT_FILES else []
+
+def load_json(file_path: Path) -> dict | list:
+    """Load JSON file, create if not exists
+    
+    Writers replace files atomically, so readers never need the lock. An
+    unreadable file reads as empty here; writers go through read_json_strict.
+    """
+    try:
+        return read_json_strict(file_path)
+    except (OSError, ValueError) as e:
+        print(f"[v0] Could not read {file_path}: {e}")
+        return default_for(file_path)
+
+def read_json_strict(file_path: Path) -> dict | list:
+    """Load JSON file, empty default only if it doesn't exist; parse errors raise
+    
+    For read-modify-write: treating a corrupt file as empty would replace it.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default_for(file_path)
+
+def iter_json_array(file_path: Path, chunk_size: int = 1 << 16) -> Iterator:
+    """Yield the items of a top-level JSON array one at a time
+    
+    Reads the file in chunks so memory stays bounded by the largest item,
+    not the file size.
+    """
+    return _iter_json_container(file_path, "[", chunk_size)
+
+def iter_json_object(file_path: Path, chunk_size: int = 1 << 16) -> Iterator:
+    """Yield the (key, value) pairs of a top-level JSON object one at a time"""
+    return _iter_json_container(file_path, "{", chunk_size)
+
+def _iter_json_container(file_path: Path, opener: str, chunk_size: int) -> Iterator:
+    if not file_path.exists():
+        return
+    closer = "]" if opener == "[" else "}"
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith(opener):
+            return
+        pos = 1
+        eof = False
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if buffer.startswith(closer, pos):
+                return
+            if len(buffer) - pos < chunk_size and not eof:
+                # Keep at least a chunk ahead so most items decode on the first try
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            try:
+                if opener == "{":
+                    key, end = decoder.raw_decode(buffer, pos)
+                    value, end = decoder.raw_decode(buffer, _KEY_SEPARATOR.match(buffer, end).end())
+                    item = (key, value)
+                else:
+                    item, end = decoder.raw_decode(buffer, pos)
+                if end == len(buffer) and not eof:
+                    raise ValueError("item may continue in the next chunk")
+            except ValueError:
+                # Item continues past the buffer; read more unless the file is done
+                if eof:
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+
+def save_json(file_path: Path, data, indent: int = 2):
+    """Save data to JSON file atomically and bump its version counter"""
+    body = json.dumps(data, indent=indent).encode()
+    counter_file = _version_file(file_path)
+    # Own lock, so this works whether or not the caller holds file_lock(file_path);
+    # the counter only moves after the new data is in place
+    with file_lock(counter_file):
+        save_bytes(file_path, body)
+        save_bytes(counter_file, str(data_version(file_path) + 1).encode())
+
+def _version_file(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + ".version")
+
+def data_version(file_path: Path) -> int:
+    """Number of times save_json has written file_path (0 if never)"""
+    try:
+        return int(_version_file(file_path).read_text())
+    except (OSError, ValueError):
+        return 0
+
+def file_version(file_path: Path) -> tuple:
+    """Change marker for a data file: (save counter, mtime_ns, size)
+    
+    The counter changes on every save_json even when a same-size rewrite lands
+    within the filesystem's mtime granularity; mtime and size catch files
+    replaced by other means (restores, manual edits).
+    """
+    counter = data_version(file_path)
+    try:
+        stat = file_path.stat()
+        return (counter, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return (counter, 0, 0)
+
+def save_bytes(file_path: Path, data: bytes):
+    """Write a temp file in the same directory, fsync it and rename it over file_path"""
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@contextmanager
+def update_json(file_path: Path):
+    """Locked read-modify-write of a JSON file; mutate the yielded object in place"""
+    with file_lock(file_path):
+        data = read_json_strict(file_path)
+        yield data
+        save_json(file_path, data)
+
+class IdAllocator:
+    """Monotonic per-collection ids shared by every worker process"""
+    
+    def __init__(self, counters_file: Path):
+        self.counters_file = counters_file
+    
+    def next(self, collection: str, existing: Iterable[str] = ()) -> str:
+        """Allocate the next id; a new counter starts above the highest numeric id in existing"""
+        with file_lock(self.counters_file):
+            counters = read_json_strict(self.counters_file) if self.counters_file.exists() else {}
+            if not isinstance(counters, dict):
+                raise ValueError(f"{self.counters_file} does not hold a JSON object")
+            if collection not in counters:
+                counters[collection] = max((int(i) for i in existing if str(i).isdigit()), default=0)
+            counters[collection] += 1
+            save_json(self.counters_file, counters)
+            return str(counters[collection])
+    
+    def reserve(self, collection: str, used: Iterable[str]):
+        """Make sure ids allocated later are above every numeric id in used"""
+        highest = max((int(i) for i in used if str(i).isdigit()), default=0)
+        with file_lock(self.counters_file):
+            counters = read_json_strict(self.counters_file) if self.counters_file.exists() else {}
+            if not isinstance(counters, dict):
+                raise ValueError(f"{self.counters_file} does not hold a JSON object")
+            if counters.get(collection, 0) < highest:
+                counters[collection] = highest
+                save_json(self.counters_file, counters)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import tkinter as tk
+import requests
+from pathlib import Path
+from typing import Callable, Optional
+
+class ApiClient:
+    """Backend reads served from a local disk cache and refreshed on a worker thread"""
+    
+    def __init__(self, root: tk.Tk, backend_url: str, cache_dir: Optional[Path] = None, timeout: float = 10):
+        self.root = root
+        self.backend_url = backend_url
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".cats" / "cache"
+        # Cached responses include patient history, so only this user may read them
+        self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        try:
+            self.cache_dir.chmod(0o700)
+        except OSError:
+            pass
+        self.memory = {}
+        self.etags = {}
+        
+        # Worker threads never touch Tk; results are handed to the main loop here
+        self.results = queue.Queue()
+        self.root.after(50, self._deliver)
+    
+    def _cache_file(self, path: str) -> Path:
+        key = hashlib.sha1(f"{self.backend_url}{path}".encode()).hexdigest()[:20]
+        return self.cache_dir / f"{key}.json"
+    
+    def cached(self, path: str):
+        """Last known response for path, or None"""
+        if path in self.memory:
+            return self.memory[path]
+        
+        try:
+            with open(self._cache_file(path), 'r') as f:
+                self.memory[path] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            self.etags[path] = self._cache_file(path).with_suffix(".etag").read_text().strip()
+        except OSError:
+            pass
+        return self.memory[path]
+    
+    def get(self, path: str, on_data: Callable, owner: Optional[tk.Widget] = None):
+        """Return the cached response now and call on_data(fresh) on the Tk thread if it changed
+        
+        on_data is skipped if owner (usually the screen frame) was destroyed meanwhile.
+        """
+        cached = self.cached(path)
+        threading.Thread(target=self._fetch, args=(path, cached, on_data, owner), daemon=True).start()
+        return cached
+    
+    def _fetch(self, path: str, cached, on_data: Callable, owner: Optional[tk.Widget]):
+        # Revalidate with the cached ETag; a 304 costs a few bytes instead of the payload
+        headers = {}
+        if cached is not None and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        
+        try:
+            resp = requests.get(f"{self.backend_url}{path}", headers=headers, timeout=self.timeout)
+            if resp.status_code == 304:
+                return
+            resp.raise_for_status()
+            data = resp.json()
+        except Exception as e:
+            print(f"[v0] Fetch error for {path}: {e}")
+            return
+        
+        self.memory[path] = data
+        self._write_cache(path, data, resp.headers.get("ETag"))
+        if data != cached:
+            self.results.put((on_data, owner, data))
+    
+    def _write_cache(self, path: str, data, etag: Optional[str] = None):
+        """Write atomically so a crash never leaves a half-written cache file
+        
+        Each write gets its own owner-only (0600) temp file, so concurrent
+        fetches of the same path can't interleave.
+        """
+        cache_file = self._cache_file(path)
+        etag_file = cache_file.with_suffix(".etag")
+        tmp_path = None
+        try:
+            # Drop the old ETag first so it can never pair with newer data
+            etag_file.unlink(missing_ok=True)
+            self.etags.pop(path, None)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{cache_file.stem}.", suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, cache_file)
+            tmp_path = None
+            if etag:
+                etag_file.write_text(etag)
+                self.etags[path] = etag
+        except OSError as e:
+            print(f"[v0] Cache write error: {e}")
+        finally:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+    
+    def _deliver(self):
+        """Run callbacks for fetched data on the Tk main thread"""
+        while not self.results.empty():
+            on_data, owner, data = self.results.get_nowait()
+            if owner is None or owner.winfo_exists():
+                on_data(data)
+        
+        try:
+            self.root.after(50, self._deliver)
+        except tk.TclError:
+            pass  # Window closed
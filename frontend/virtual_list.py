@@ -0,0 +1,109 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+
+class VirtualList(ttk.Frame):
+    """Scrollable list that only creates widgets for the rows currently visible
+    
+    make_row(parent) must return (widget, update) where update(item) refreshes
+    the widget for an item (item is None while its page is loading).
+    load_page(offset, limit, on_loaded) fetches rows and calls
+    on_loaded(offset, items, total), possibly more than once (cached, then fresh).
+    """
+    
+    def __init__(self, parent, row_height: int, make_row: Callable, load_page: Callable, page_size: int = 50):
+        super().__init__(parent)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.load_page = load_page
+        self.page_size = page_size
+        
+        self.canvas = tk.Canvas(self, highlightthickness=0, yscrollincrement=row_height)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.canvas.bind("<Configure>", lambda e: self._refresh())
+        
+        # Rows cover the canvas, so the wheel is bound on a tag given to the
+        # canvas and every row widget rather than on the canvas alone
+        self.wheel_tag = f"VirtualListWheel{id(self)}"
+        self.bind_class(self.wheel_tag, "<MouseWheel>", self._on_wheel)
+        self.bind_class(self.wheel_tag, "<Button-4>", lambda e: self._scroll(-3))
+        self.bind_class(self.wheel_tag, "<Button-5>", lambda e: self._scroll(3))
+        self._add_wheel_tag(self.canvas)
+        self.bind("<Destroy>", self._on_destroy)
+        
+        self.pool = []  # [(window id, widget, update)], reused as rows scroll by
+        self.reset()
+    
+    def reset(self):
+        """Drop loaded rows and start again from the first page"""
+        self.items = {}
+        self.requested_pages = set()
+        self.total = 0
+        self.canvas.yview_moveto(0)
+        self._request_page(0)
+        self._refresh()
+    
+    def _request_page(self, page: int):
+        if page in self.requested_pages:
+            return
+        self.requested_pages.add(page)
+        self.load_page(page * self.page_size, self.page_size, self._on_loaded)
+    
+    def _on_loaded(self, offset: int, items: list, total: int):
+        for i, item in enumerate(items):
+            self.items[offset + i] = item
+        self.total = total
+        self._refresh()
+    
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._refresh()
+    
+    def _scroll(self, units: int):
+        self.canvas.yview_scroll(units, "units")
+        self._refresh()
+    
+    def _on_wheel(self, event):
+        self._scroll(-1 if event.delta > 0 else 1)
+    
+    def _add_wheel_tag(self, widget):
+        widget.bindtags((self.wheel_tag,) + widget.bindtags())
+        for child in widget.winfo_children():
+            self._add_wheel_tag(child)
+    
+    def _on_destroy(self, event):
+        if event.widget is self:
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.unbind_class(self.wheel_tag, sequence)
+    
+    def _refresh(self):
+        """Position pooled row widgets over the visible rows only"""
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        self.canvas.configure(scrollregion=(0, 0, width, self.total * self.row_height))
+        
+        first = max(0, int(self.canvas.canvasy(0)) // self.row_height)
+        visible = min(height // self.row_height + 2, max(0, self.total - first))
+        
+        while len(self.pool) < visible:
+            widget, update = self.make_row(self.canvas)
+            self._add_wheel_tag(widget)
+            window = self.canvas.create_window(0, 0, window=widget, anchor=tk.NW)
+            self.pool.append((window, widget, update))
+        
+        for slot, (window, widget, update) in enumerate(self.pool):
+            index = first + slot
+            if slot >= visible:
+                self.canvas.itemconfigure(window, state=tk.HIDDEN)
+                continue
+            
+            item = self.items.get(index)
+            if item is None:
+                self._request_page(index // self.page_size)
+            self.canvas.coords(window, 0, index * self.row_height)
+            self.canvas.itemconfigure(window, width=width, height=self.row_height, state=tk.NORMAL)
+            update(item)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""Move sessions older than the retention window out of sessions.json into monthly archive segments"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from session_archive import SessionArchive
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--older-than-days", type=int, default=int(os.environ.get("CATS_RETENTION_DAYS", "180")),
+                        help="archive sessions older than this many days (default: $CATS_RETENTION_DAYS or 180)")
+    parser.add_argument("--data-dir", type=Path, default=ROOT / "backend" / "data", help="backend data directory")
+    args = parser.parse_args()
+    
+    sessions_file = args.data_dir / "sessions.json"
+    if not sessions_file.exists():
+        print(f"No sessions file at {sessions_file}")
+        return 1
+    
+    archive = SessionArchive(args.data_dir / "archive")
+    result = archive.archive(sessions_file, args.older_than_days)
+    if not result["archived"]:
+        print(f"Nothing older than {result['cutoff']} to archive")
+        return 0
+    
+    print(f"Archived {result['archived']} sessions created before {result['cutoff']} into {', '.join(result['months'])}")
+    for segment in archive.manifest()["segments"]:
+        size = (archive.archive_dir / segment["file"]).stat().st_size / 1024
+        print(f"  {segment['month']}: {segment['count']} sessions, {size:.0f} KB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Measure ExerciseEngine throughput and accuracy on synthetic landmark streams, no camera needed
+
+Every exercise in config/exercise.json (or just --exercise) is generated with
+the same motion settings and seed, so runs are reproducible across machines.
+    
+    python scripts/benchmark_engine.py --reps 200 --noise 0.002 --rom-decay 0.3 --fault-rate 0.2
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from exercise_config import compile_exercise
+from exercise_engine import ExerciseEngine
+from motion_synth import generate_motion
+
+EXERCISE_CONFIG = ROOT / "config" / "exercise.json"
+
+def run_engine(definition, motion) -> dict:
+    """Feed the stream through a fresh engine; time it and score it against the ground truth"""
+    engine = ExerciseEngine(definition)
+    detected = np.zeros(motion.faults.shape, dtype=bool)
+    columns = {name: i for i, name in enumerate(motion.fault_names)}
+    metrics = None
+    start = time.perf_counter()
+    for frame, (landmarks, timestamp) in enumerate(zip(motion.landmark_lists(), motion.timestamps.tolist())):
+        metrics, posture_errors = engine.process_landmarks(landmarks, timestamp)
+        for error in posture_errors:
+            detected[frame, columns[error]] = True
+    elapsed = time.perf_counter() - start
+    
+    # Posture scoring only counts frames where the person was visible
+    visible = ~motion.dropped[:, None]
+    truth = motion.faults & visible
+    hits = int((detected & truth).sum())
+    return {
+        "fps": len(motion) / elapsed,
+        "reps": metrics["reps"],
+        "fatigue": metrics["fatigue_detected"],
+        "rom_reduction": metrics["rom_reduction"],
+        "precision": hits / detected.sum() if detected.any() else 1.0,
+        "recall": hits / truth.sum() if truth.any() else 1.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercise", help="exercise id or name (default: all)")
+    parser.add_argument("--reps", type=int, default=50, help="reps per exercise")
+    parser.add_argument("--fps", type=float, default=30, help="frame rate of the generated stream")
+    parser.add_argument("--tempo", type=float, default=3.0, help="seconds per rep")
+    parser.add_argument("--tempo-jitter", type=float, default=0.1, help="per-rep tempo variation, as a fraction")
+    parser.add_argument("--rom-decay", type=float, default=0.0, help="fraction of ROM lost by the last rep")
+    parser.add_argument("--noise", type=float, default=0.0, help="landmark jitter std (normalized units)")
+    parser.add_argument("--dropout-rate", type=float, default=0.0, help="per-frame probability a dropout starts")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="fraction of reps showing each posture fault")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-dir", type=Path, help="also save each stream as <exercise id>.npy for ReplayBackend.from_file")
+    args = parser.parse_args()
+    
+    with open(EXERCISE_CONFIG, 'r') as f:
+        exercises = json.load(f)
+    if args.exercise:
+        exercises = [e for e in exercises if args.exercise in (str(e["id"]), e["name"])]
+        if not exercises:
+            print(f"Unknown exercise {args.exercise!r}")
+            return 1
+    if args.save_dir:
+        args.save_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"{'exercise':<16} {'frames':>8} {'frames/s':>9} {'reps':>12} {'fatigue':>13} {'posture P/R':>12}")
+    failed = ambiguous = 0
+    for exercise in exercises:
+        definition = compile_exercise(exercise)
+        motion = generate_motion(
+            definition, reps=args.reps, fps=args.fps, tempo=args.tempo, tempo_jitter=args.tempo_jitter,
+            rom_decay=args.rom_decay, noise=args.noise, dropout_rate=args.dropout_rate,
+            posture_faults={name: args.fault_rate for name in definition.posture_rules.errors} if args.fault_rate else None,
+            seed=args.seed,
+        )
+        if args.save_dir:
+            np.save(args.save_dir / f"{exercise['id']}.npy", motion.landmarks)
+        
+        result = run_engine(definition, motion)
+        # Reps near a threshold may go either way under noise; a count outside the range is wrong,
+        # but one inside it only checks the counter when the range is a single count
+        failed += not motion.min_reps <= result["reps"] <= motion.max_reps
+        ambiguous += motion.ambiguous
+        expected = f"{motion.min_reps}-{motion.max_reps}" if motion.ambiguous else str(motion.expected_reps)
+        print(f"{exercise['name']:<16} {len(motion):>8} {result['fps']:>9.0f} {result['reps']:>4}/{expected:<7} "
+              f"{'yes' if result['fatigue'] else 'no':>4} ({result['rom_reduction']:4.1f}%) {result['precision']:>5.2f}/{result['recall']:<5.2f}")
+    
+    print(f"Rep count matched the ground truth for {len(exercises) - failed - ambiguous} of {len(exercises)} exercises"
+          f"{f', missed it for {failed}' if failed else ''}"
+          f"{f'; {ambiguous} too noisy near a threshold to check (count in range)' if ambiguous else ''}")
+    return 1 if failed or ambiguous == len(exercises) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Measure how quickly the patient UI becomes interactive and warmed up"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Runs in a fresh interpreter each time so no module is already cached
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path[:0] = [{frontend!r}, {backend!r}]
+import patient_ui
+imported = time.perf_counter()
+ui = patient_ui.PatientUI(1, "Benchmark", backend_url="http://127.0.0.1:9")
+ui.root.update()
+interactive = time.perf_counter()
+ui.warmup_done.wait()
+warmed = time.perf_counter()
+ui.root.destroy()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "interactive_ms": (interactive - start) * 1000,
+    "warm_ms": (warmed - start) * 1000,
+}}))
+"""
+
+def run_probe() -> dict:
+    """Start the UI once in a subprocess and return its timings"""
+    code = PROBE.format(frontend=str(ROOT / "frontend"), backend=str(ROOT / "backend"))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to measure")
+    args = parser.parse_args()
+    
+    runs = []
+    for i in range(args.runs):
+        try:
+            runs.append(run_probe())
+        except Exception as e:
+            print(f"Run {i + 1} failed: {e}")
+            return 1
+    
+    print(f"Patient UI startup over {len(runs)} cold starts (median / max):")
+    for key, label in [("import_ms", "Module import"), ("interactive_ms", "Home screen interactive"), ("warm_ms", "Pose model + TTS warm")]:
+        values = [r[key] for r in runs]
+        print(f"  {label:<25} {statistics.median(values):8.1f} ms / {max(values):8.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Export sessions as CSV or Parquet, from a running backend or straight from the data files"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+import requests
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+def export_remote(args, output) -> int:
+    """Stream the backend's /sessions/export response to output"""
+    params = {
+        "format": args.format,
+        "start": args.start,
+        "end": args.end,
+        "patient_id": args.patient,
+        "exercise_id": args.exercise,
+    }
+    with requests.get(f"{args.url}/sessions/export", params={k: v for k, v in params.items() if v is not None},
+                      stream=True, timeout=args.timeout) as resp:
+        if resp.status_code != 200:
+            print(f"Export failed ({resp.status_code}): {resp.text}")
+            return 1
+        for chunk in resp.iter_content(chunk_size=1 << 16):
+            output.write(chunk)
+    return 0
+
+def export_local(args, output) -> int:
+    """Read the sessions file directly, for when the backend isn't running"""
+    from session_export import created_at_bound, iter_export, iter_sessions
+    
+    sessions = iter_sessions(args.sessions_file, start=created_at_bound(args.start), end=created_at_bound(args.end),
+                             patient_id=args.patient, exercise_id=args.exercise)
+    try:
+        chunks = iter_export(sessions, args.format)
+    except ImportError:
+        print("Parquet export requires pyarrow (pip install pyarrow)")
+        return 1
+    for chunk in chunks:
+        output.write(chunk)
+    return 0
+
+def iso_date(text: str) -> str:
+    return datetime.fromisoformat(text).isoformat()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--start", type=iso_date, help="only sessions created at or after this date/time")
+    parser.add_argument("--end", type=iso_date, help="only sessions created before this date/time")
+    parser.add_argument("--patient", help="only this patient id")
+    parser.add_argument("--exercise", help="only this exercise id")
+    parser.add_argument("-o", "--output", type=Path, help="output file (default: stdout)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--url", help="export through a running backend, e.g. http://localhost:8000")
+    source.add_argument("--sessions-file", type=Path, default=ROOT / "backend" / "data" / "sessions.json",
+                        help="sessions file to read when --url is not given")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the backend")
+    args = parser.parse_args()
+    
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        if args.url:
+            return export_remote(args, output)
+        return export_local(args, output)
+    finally:
+        if args.output:
+            output.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
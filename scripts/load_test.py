@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""Simulate many clinic stations against a running backend and report per-endpoint latency"""
+
+import argparse
+import base64
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+import numpy as np
+import requests
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from session_timeline import TIMELINE_DTYPE, encode_timeline
+
+DEFAULT_MIX = "login=1,exercises=4,history=4,save=1"
+PERCENTILES = (50, 95, 99)
+
+class Stats:
+    """Latencies per endpoint, for the current report window and the whole run"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.window = {}
+        self.total = {}
+        self.errors = {}
+        self.saves = 0
+    
+    def record(self, op: str, seconds: float, ok: bool):
+        with self.lock:
+            if not ok:
+                self.errors[op] = self.errors.get(op, 0) + 1
+                return
+            self.window.setdefault(op, []).append(seconds)
+            self.total.setdefault(op, []).append(seconds)
+            if op == "save":
+                self.saves += 1
+    
+    def take_window(self) -> dict:
+        with self.lock:
+            window, self.window = self.window, {}
+        return window
+
+def parse_mix(text: str) -> dict:
+    """Parse "op=weight,..." into {op: weight}"""
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        op = op.strip()
+        if op not in Station.OPS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{op}' (choose from {', '.join(Station.OPS)})")
+        mix[op] = float(weight or 1)
+    return mix
+
+def make_timelines(count: int, seconds: int, rng: np.random.Generator) -> list:
+    """Pre-encode a few realistic timelines so building them doesn't load the client"""
+    blobs = []
+    for _ in range(count):
+        points = np.zeros(seconds * 10, dtype=TIMELINE_DTYPE)
+        points["t"] = np.arange(len(points)) * 100
+        phase = np.linspace(0, 2 * np.pi * seconds / 3, len(points))
+        points["angle"] = 110 + 60 * np.cos(phase) + rng.normal(0, 2, len(points))
+        points["speed"] = np.abs(np.gradient(points["angle"])) / 1000
+        points["reps"] = np.floor(phase / (2 * np.pi))
+        points["flags"] = (rng.random(len(points)) < 0.05).astype(np.int32)
+        points["side_angles"] = points["angle"][:, None, None] + rng.normal(0, 3, (len(points), 2, 2))
+        blobs.append(base64.b64encode(encode_timeline(points, ["Back not straight"], sides=2)).decode("ascii"))
+    return blobs
+
+class Station:
+    """One simulated clinic station: logs in once, then loops over the operation mix"""
+    
+    OPS = ("login", "exercises", "history", "save")
+    
+    def __init__(self, index: int, args, stats: Stats, timelines: list, stop: threading.Event):
+        self.index = index
+        self.args = args
+        self.stats = stats
+        self.timelines = timelines
+        self.stop = stop
+        self.rng = random.Random(args.seed + index)
+        self.http = requests.Session()
+        self.email = f"station-{args.run_id}-{index}@loadtest.local"
+        self.password = "loadtest"
+        self.user_id = None
+        self.etags = {}  # Revalidate like the frontend ApiClient does
+    
+    def run(self):
+        try:
+            self.http.post(f"{self.args.url}/auth/register", json={
+                "email": self.email,
+                "password": self.password,
+                "name": f"Load Station {self.index}",
+                "role": "patient"
+            }, timeout=self.args.timeout)
+        except requests.RequestException as e:
+            print(f"[v0] Station {self.index} register error: {e}")
+        self.login()
+        
+        ops = list(self.args.mix)
+        weights = [self.args.mix[op] for op in ops]
+        while not self.stop.is_set():
+            getattr(self, self.rng.choices(ops, weights)[0])()
+            if self.args.think > 0:
+                self.stop.wait(self.rng.expovariate(1000 / self.args.think))
+    
+    def _request(self, op: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = self.http.request(method, f"{self.args.url}{path}", timeout=self.args.timeout, **kwargs)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            resp, ok = None, False
+        self.stats.record(op, time.perf_counter() - start, ok)
+        return resp if ok else None
+    
+    def _get(self, op: str, path: str):
+        headers = {"If-None-Match": self.etags[path]} if path in self.etags else {}
+        resp = self._request(op, "GET", path, headers=headers)
+        if resp is not None and resp.headers.get("ETag"):
+            self.etags[path] = resp.headers["ETag"]
+    
+    def login(self):
+        resp = self._request("login", "POST", "/auth/login", params={"email": self.email, "password": self.password})
+        if resp is not None:
+            self.user_id = resp.json()["id"]
+    
+    def exercises(self):
+        self._get("exercises", "/exercises")
+    
+    def history(self):
+        if self.user_id is not None:
+            self._get("history", f"/sessions/history/{self.user_id}")
+    
+    def save(self):
+        if self.user_id is None:
+            return
+        reps = self.rng.randint(5, 15)
+        summary = {
+            "total_reps": reps,
+            "avg_speed": self.rng.uniform(0.01, 0.05),
+            "avg_rom": self.rng.uniform(60, 120),
+            "duration_seconds": self.rng.uniform(60, 300),
+            "fatigue_detected": self.rng.random() < 0.2,
+            "posture_errors": self.rng.randint(0, 50),
+            "completion_percentage": min(reps / 15 * 100, 100),
+        }
+        self._request("save", "POST", "/sessions/save", json={
+            "patient_id": str(self.user_id),
+            "exercise_id": str(self.rng.randint(1, 10)),
+            "completion_percentage": summary["completion_percentage"],
+            "avg_speed": summary["avg_speed"],
+            "fatigue_detected": summary["fatigue_detected"],
+            "form_errors": summary["posture_errors"],
+            "session_summary": summary,
+            "timeline": self.rng.choice(self.timelines) if self.timelines else None
+        })
+
+def format_row(op: str, latencies: list, elapsed: float, errors: int = 0) -> str:
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, PERCENTILES) if latencies else (0, 0, 0)
+    return f"  {op:<10} {len(latencies):>7} {len(latencies) / elapsed:>8.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {errors:>6}"
+
+HEADER = f"  {'endpoint':<10} {'ok':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000", help="backend base URL")
+    parser.add_argument("--stations", type=int, default=20, help="number of concurrent stations")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run after ramp-up starts")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which stations are started")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--think", type=float, default=200, help="mean think time between requests in ms (0 = none)")
+    parser.add_argument("--timeline-seconds", type=int, default=120, help="length of the timeline sent with each save (0 = none)")
+    parser.add_argument("--report-every", type=float, default=10, help="seconds between interim reports")
+    parser.add_argument("--sessions-file", type=Path, default=ROOT / "backend" / "data" / "sessions.json", help="sessions file to report the size of")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.run_id = int(time.time())
+    
+    try:
+        requests.get(f"{args.url}/health", timeout=5).raise_for_status()
+    except requests.RequestException as e:
+        print(f"Backend not reachable at {args.url}: {e}")
+        return 1
+    
+    rng = np.random.default_rng(args.seed)
+    timelines = make_timelines(8, args.timeline_seconds, rng) if args.timeline_seconds > 0 else []
+    stats = Stats()
+    stop = threading.Event()
+    started = [0]
+    
+    def start_stations():
+        for i in range(args.stations):
+            if stop.wait(max(0, start + args.ramp * i / args.stations - time.perf_counter())):
+                return
+            threading.Thread(target=Station(i, args, stats, timelines, stop).run, daemon=True).start()
+            started[0] += 1
+    
+    start = time.perf_counter()
+    threading.Thread(target=start_stations, daemon=True).start()
+    
+    # Interim reports show how latency moves as stations join and the sessions file grows
+    last = start
+    while (now := time.perf_counter()) - start < args.duration:
+        stop.wait(min(args.report_every, args.duration - (now - start)))
+        now = time.perf_counter()
+        size = args.sessions_file.stat().st_size / 1024 if args.sessions_file.exists() else 0
+        print(f"[{now - start:6.1f}s] stations={started[0]} saves={stats.saves} sessions file={size:.0f} KB")
+        print(HEADER)
+        for op, latencies in sorted(stats.take_window().items()):
+            print(format_row(op, latencies, now - last))
+        last = now
+    stop.set()
+    elapsed = time.perf_counter() - start
+    
+    print(f"\nTotal over {elapsed:.1f}s with {args.stations} stations:")
+    print(HEADER)
+    for op in Station.OPS:
+        if op in stats.total or op in stats.errors:
+            print(format_row(op, stats.total.get(op, []), elapsed, stats.errors.get(op, 0)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
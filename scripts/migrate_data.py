@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""Seed the CATS data files and migrate users, exercises and sessions from JSON into SQLite
+    
+    python scripts/migrate_data.py seed                  # default exercises + test users
+    python scripts/migrate_data.py migrate --db cats.db  # JSON data files -> SQLite
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from session_archive import SessionArchive
+from storage import IdAllocator, file_lock, iter_json_array, iter_json_object, update_json
+
+EXERCISE_CONFIG = ROOT / "config" / "exercise.json"
+TEST_USERS = [
+    ("patient@test.com", "pass123", "Patient John", "patient"),
+    ("doctor@test.com", "pass123", "Dr. Sarah", "doctor"),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    password TEXT,
+    name TEXT,
+    role TEXT,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS exercises (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    category TEXT,
+    description TEXT,
+    target_reps INTEGER,
+    config_json TEXT
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    patient_id TEXT,
+    exercise_id TEXT,
+    completion_percentage REAL,
+    avg_speed REAL,
+    fatigue_detected INTEGER,
+    form_errors INTEGER,
+    session_summary TEXT,
+    timeline_points INTEGER,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_patient ON sessions (patient_id, created_at);
+CREATE INDEX IF NOT EXISTS sessions_exercise ON sessions (exercise_id, created_at);
+CREATE TABLE IF NOT EXISTS migration_checkpoints (
+    source TEXT PRIMARY KEY,
+    version TEXT,
+    position INTEGER,
+    completed INTEGER
+);
+"""
+
+# table -> (columns, row builder from a JSON record)
+TABLES = {
+    "users": (
+        ("id", "email", "password", "name", "role", "created_at"),
+        lambda u: (u.get("id"), u.get("email"), u.get("password"), u.get("name"), u.get("role"), u.get("created_at")),
+    ),
+    "exercises": (
+        ("id", "name", "category", "description", "target_reps", "config_json"),
+        lambda e: (e.get("id"), e.get("name"), e.get("category"), e.get("description"), e.get("target_reps"), json.dumps(e.get("config_json", {}))),
+    ),
+    "sessions": (
+        ("id", "patient_id", "exercise_id", "completion_percentage", "avg_speed", "fatigue_detected",
+         "form_errors", "session_summary", "timeline_points", "created_at"),
+        lambda s: (s.get("id"), s.get("patient_id"), s.get("exercise_id"), s.get("completion_percentage"),
+                   s.get("avg_speed"), int(bool(s.get("fatigue_detected"))), s.get("form_errors"),
+                   json.dumps(s.get("session_summary", {})), s.get("timeline_points", 0), s.get("created_at")),
+    ),
+}
+
+def seed(data_dir: Path):
+    """Add the default exercise library and test accounts to the JSON data files, keeping existing records"""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    ids = IdAllocator(data_dir / "counters.json")
+    
+    with open(EXERCISE_CONFIG, 'r') as f:
+        library = json.load(f)
+    with update_json(data_dir / "exercises.json") as exercises:
+        by_id = {str(e.get("id")): e for e in exercises}
+        names = {e.get("name") for e in exercises}
+        missing = [e for e in library if e["name"] not in names]
+        # Fresh ids go above the library's own ids too, so a moved exercise can't take another's id
+        ids.reserve("exercises", list(by_id) + [str(e["id"]) for e in library])
+        added = []
+        for exercise in missing:
+            taken = by_id.get(str(exercise["id"]))
+            if taken is not None:
+                new_id = ids.next("exercises")
+                print(f"  Exercise id {exercise['id']} is taken by {taken.get('name')!r}; adding {exercise['name']!r} as {new_id}")
+                exercise = {**exercise, "id": new_id}
+            by_id[str(exercise["id"])] = exercise
+            added.append(exercise)
+        exercises.extend(added)
+    print(f"Exercises: added {len(added)}, {len(library) - len(added)} already present")
+    
+    with update_json(data_dir / "users.json") as users:
+        for email, password, name, role in TEST_USERS:
+            if email in users:
+                continue
+            users[email] = {
+                "id": ids.next("users", (u.get("id", "") for u in users.values())),
+                "email": email,
+                "password": password,
+                "name": name,
+                "role": role,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+    print("Test users:")
+    for email, password, _, role in TEST_USERS:
+        print(f"  {role.title()}: {email} / {password}")
+
+def file_version(file_path: Path) -> str:
+    stat = file_path.stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+def sources(data_dir: Path) -> Iterator[Tuple[str, str, Path, Path, Callable[[], Iterator[dict]]]]:
+    """(checkpoint name, table, file, file whose lock guards it, record stream) for every JSON source"""
+    users_file = data_dir / "users.json"
+    exercises_file = data_dir / "exercises.json"
+    sessions_file = data_dir / "sessions.json"
+    yield "users.json", "users", users_file, users_file, lambda: (u for _, u in iter_json_object(users_file))
+    yield "exercises.json", "exercises", exercises_file, exercises_file, lambda: iter_json_array(exercises_file)
+    
+    # Archive segments are rewritten under the manifest lock
+    archive = SessionArchive(data_dir / "archive")
+    for segment in archive.manifest().get("segments", []):
+        yield (f"archive/{segment['file']}", "sessions", archive.archive_dir / segment["file"], archive.manifest_file,
+               lambda file_name=segment["file"]: archive.read_segment(file_name))
+    yield "sessions.json", "sessions", sessions_file, sessions_file, lambda: iter_json_array(sessions_file)
+
+def migrate_source(conn: sqlite3.Connection, name: str, table: str, file_path: Path, records: Iterator[dict],
+                   batch_size: int, expected_ids: set) -> int:
+    """Copy one source in batches, committing the checkpoint with each batch so a rerun resumes"""
+    columns, build_row = TABLES[table]
+    insert = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    
+    version = file_version(file_path)
+    checkpoint = conn.execute("SELECT version, position, completed FROM migration_checkpoints WHERE source = ?", (name,)).fetchone()
+    # A source that changed since the checkpoint is copied again from the start (inserts are idempotent)
+    resume_at = checkpoint[1] if checkpoint and checkpoint[0] == version else 0
+    if checkpoint and checkpoint[0] == version and checkpoint[2]:
+        resume_at = None
+    
+    copied = 0
+    batch = []
+    position = 0
+    
+    def flush():
+        with conn:
+            conn.executemany(insert, batch)
+            conn.execute("INSERT OR REPLACE INTO migration_checkpoints VALUES (?, ?, ?, 0)", (name, version, position))
+    
+    for record in records:
+        expected_ids.add(record.get("id"))
+        position += 1
+        if resume_at is None or position <= resume_at:
+            continue  # Already copied; still read so the id shows up in verification
+        batch.append(build_row(record))
+        if len(batch) == batch_size:
+            flush()
+            copied += len(batch)
+            batch = []
+    if batch:
+        flush()
+        copied += len(batch)
+    
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO migration_checkpoints VALUES (?, ?, ?, 1)", (name, version, position))
+    state = "up to date" if resume_at is None else (f"resumed at {resume_at}" if resume_at else "copied")
+    print(f"  {name:<40} {position:>9} records, {copied:>9} written ({state})")
+    return copied
+
+def migrate(data_dir: Path, db_path: Path, batch_size: int, fresh: bool) -> int:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    if fresh:
+        with conn:
+            conn.execute("DELETE FROM migration_checkpoints")
+    
+    start = time.perf_counter()
+    expected = {table: set() for table in TABLES}
+    print(f"Migrating {data_dir} -> {db_path}")
+    for name, table, file_path, lock_file, records in sources(data_dir):
+        if not file_path.exists():
+            print(f"  {name:<40} missing, skipped")
+            continue
+        # Hold the writer lock so the file can't change underneath the copy
+        with file_lock(lock_file):
+            migrate_source(conn, name, table, file_path, records(), batch_size, expected[table])
+    
+    print(f"Done in {time.perf_counter() - start:.1f}s. Verifying row counts:")
+    ok = True
+    for table, ids in expected.items():
+        ids.discard(None)
+        rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        status = "ok" if rows == len(ids) else "MISMATCH"
+        ok &= rows == len(ids)
+        print(f"  {table:<10} source {len(ids):>9}  sqlite {rows:>9}  {status}")
+    conn.close()
+    if not ok:
+        print("Row counts differ; rerun with --fresh to copy every source again")
+    return 0 if ok else 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=ROOT / "backend" / "data", help="backend data directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("seed", help="add default exercises and test users to the JSON data files")
+    migrate_parser = commands.add_parser("migrate", help="copy JSON data files into a SQLite database")
+    migrate_parser.add_argument("--db", type=Path, default=ROOT / "backend" / "cats.db", help="SQLite database path")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany/transaction")
+    migrate_parser.add_argument("--fresh", action="store_true", help="ignore checkpoints and copy everything again")
+    args = parser.parse_args()
+    
+    if args.command == "seed":
+        seed(args.data_dir)
+        return 0
+    return migrate(args.data_dir, args.db, args.batch_size, args.fresh)
+
+if __name__ == "__main__":
+    sys.exit(main())
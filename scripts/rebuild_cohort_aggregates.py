@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""Recompute the cohort analytics aggregates from every stored session (hot and archived)"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from cohort_analytics import CohortAggregates
+from session_archive import SessionArchive
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", type=Path, default=ROOT / "backend" / "data", help="backend data directory")
+    args = parser.parse_args()
+    
+    cohort = CohortAggregates(args.data_dir / "cohort_aggregates.json", args.data_dir / "sessions.json", SessionArchive(args.data_dir / "archive"))
+    start = time.perf_counter()
+    rows = cohort.rebuild()
+    print(f"Rebuilt {rows} exercise/week/patient aggregates in {time.perf_counter() - start:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
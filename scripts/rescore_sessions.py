@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Re-score an exercise's stored session timelines under new angle thresholds
+    
+    python scripts/rescore_sessions.py --exercise 2 --down-angle 85 --up-angle 165
+"""
+
+import argparse
+import sys
+import time
+from itertools import chain
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from exercise_config import compile_exercise
+from rescoring import Rescorer, with_thresholds
+from session_archive import SessionArchive
+from storage import iter_json_array, load_json
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercise", required=True, help="exercise id")
+    parser.add_argument("--down-angle", type=float, help="override the exercise's down_angle")
+    parser.add_argument("--up-angle", type=float, help="override the exercise's up_angle")
+    parser.add_argument("--target-reps", type=int, help="override the exercise's target_reps")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--data-dir", type=Path, default=ROOT / "backend" / "data", help="backend data directory")
+    args = parser.parse_args()
+    
+    record = next((e for e in load_json(args.data_dir / "exercises.json") if str(e.get("id")) == args.exercise), None)
+    if record is None:
+        print(f"No exercise {args.exercise} in {args.data_dir / 'exercises.json'}")
+        return 1
+    try:
+        definition = compile_exercise(with_thresholds(record, args.down_angle, args.up_angle, args.target_reps))
+    except ValueError as e:
+        print(e)
+        return 1
+    
+    rescorer = Rescorer(args.data_dir / "timelines", args.data_dir / "rescoring")
+    sessions = chain(SessionArchive(args.data_dir / "archive").iter_sessions(), iter_json_array(args.data_dir / "sessions.json"))
+    start = time.perf_counter()
+    summary = rescorer.rescore(definition, sessions, processes=args.processes,
+                               progress=lambda fraction, message: print(f"  {fraction:6.1%}  {message}"))
+    print(f"Re-scored {summary['sessions_rescored']} {record.get('name', '')} sessions at "
+          f"{definition.down_angle:g}/{definition.up_angle:g} degrees in {time.perf_counter() - start:.1f}s "
+          f"({summary['sessions_without_timeline']} without a timeline); rep count changed for {summary['rep_counts_changed']}")
+    if summary["sessions_approximate"]:
+        print(f"{summary['sessions_approximate']} sessions predate per-side timelines; their scores are approximate "
+              f"and not compared with the original counts")
+    print(f"Results: {rescorer.results_file(definition.exercise_id, definition.version)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
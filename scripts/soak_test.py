@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""Drive a PoseSession through a long simulated session and fail if memory or frame time drifts
+
+Frames are fed as fast as possible with simulated timestamps, so an hour of
+session time takes a few minutes. The detector runs on a replay backend
+playing a synthetic rep cycle, so no camera or pose model is needed.
+    
+    python scripts/soak_test.py --duration 3600 --exercise Squats
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from exercise_config import compile_exercise
+from motion_synth import generate_motion
+from pose_backends import ReplayBackend
+from pose_detector import PoseDetector
+from pose_session import PoseSession
+
+EXERCISE_CONFIG = ROOT / "config" / "exercise.json"
+
+def rss_mb() -> float:
+    """Current resident set size in MB (psutil if installed, else /proc, else peak RSS)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def find_exercise(name_or_id: str) -> dict:
+    with open(EXERCISE_CONFIG, 'r') as f:
+        exercises = json.load(f)
+    for exercise in exercises:
+        if name_or_id in (str(exercise["id"]), exercise["name"]):
+            return exercise
+    raise SystemExit(f"Unknown exercise {name_or_id!r}; choose from: {', '.join(e['name'] for e in exercises)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3600, help="simulated session length in seconds")
+    parser.add_argument("--fps", type=float, default=30, help="simulated camera frame rate")
+    parser.add_argument("--exercise", default="1", help="exercise id or name from config/exercise.json")
+    parser.add_argument("--seconds-per-rep", type=float, default=3.0, help="tempo of the synthetic reps")
+    parser.add_argument("--sample-every", type=float, default=300, help="simulated seconds between samples")
+    parser.add_argument("--warmup", type=float, default=60, help="simulated seconds before the baseline sample")
+    parser.add_argument("--top", type=int, default=5, help="tracemalloc allocators to list")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip tracemalloc (faster, RSS only)")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64, help="fail if RSS grows more than this after warm-up")
+    parser.add_argument("--max-traced-growth-mb", type=float, default=16, help="fail if traced Python memory grows more than this")
+    parser.add_argument("--max-latency-drift", type=float, default=1.5, help="fail if late median frame time exceeds the early one by this factor")
+    args = parser.parse_args()
+    
+    exercise = find_exercise(args.exercise)
+    definition = compile_exercise(exercise)
+    rep_cycle = generate_motion(definition, reps=1, fps=args.fps, tempo=args.seconds_per_rep, hold=0)
+    detector = PoseDetector(ReplayBackend(rep_cycle.replay_frames()), roi_tracking=True)
+    session = PoseSession(0, exercise["id"], definition, backend_url="http://127.0.0.1:9", detector=detector)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    
+    if not args.no_tracemalloc:
+        tracemalloc.start(10)
+    total_frames = int(args.duration * args.fps)
+    warmup_frames = int(args.warmup * args.fps)
+    sample_frames = max(int(args.sample_every * args.fps), 1)
+    print(f"Soaking {exercise['name']} for {args.duration:.0f}s of session time ({total_frames} frames at {args.fps:g} fps)")
+    print(f"{'session':>9} {'frames':>9} {'rss MB':>8} {'traced MB':>10} {'p50 ms':>7} {'p95 ms':>7} {'reps':>6}")
+    
+    samples = []
+    baseline = None
+    window = []
+    started = time.perf_counter()
+    for i in range(total_frames):
+        start = time.perf_counter()
+        _, metrics, _ = session.process_frame(frame, i / args.fps)
+        window.append((time.perf_counter() - start) * 1000)
+        
+        done = i + 1
+        if done != total_frames and (done < warmup_frames or (done - warmup_frames) % sample_frames):
+            continue
+        gc.collect()
+        sample = {
+            "seconds": done / args.fps,
+            "frames": done,
+            "rss_mb": rss_mb(),
+            "traced_mb": tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else 0.0,
+            "p50_ms": statistics.median(window),
+            "p95_ms": float(np.percentile(window, 95)),
+            "reps": metrics["reps"],
+        }
+        window = []
+        print(f"{sample['seconds']:>8.0f}s {sample['frames']:>9} {sample['rss_mb']:>8.1f} {sample['traced_mb']:>10.2f} "
+              f"{sample['p50_ms']:>7.2f} {sample['p95_ms']:>7.2f} {sample['reps']:>6}")
+        if not samples and tracemalloc.is_tracing():
+            baseline = tracemalloc.take_snapshot()
+        samples.append(sample)
+    
+    elapsed = time.perf_counter() - started
+    end_start = time.perf_counter()
+    summary = session.end_session()
+    end_ms = (time.perf_counter() - end_start) * 1000
+    expected_reps = int(args.duration / args.seconds_per_rep)
+    print(f"Ran in {elapsed:.0f}s; end_session took {end_ms:.0f} ms; counted {summary['total_reps']} of ~{expected_reps} reps")
+    
+    if baseline is not None:
+        print(f"Top {args.top} allocators by growth since warm-up:")
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        growth = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(baseline.filter_traces(ignore), "traceback")
+        for stat in [stat for stat in growth if stat.size_diff > 0][:args.top]:
+            # Innermost frame in our own code, so numpy internals don't hide the caller
+            where = next((frame for frame in reversed(stat.traceback) if frame.filename.startswith(str(ROOT))), stat.traceback[-1])
+            print(f"  {stat.size_diff / 1024:+10.1f} KB {stat.count_diff:+8} blocks  {where.filename}:{where.lineno}")
+        tracemalloc.stop()
+    
+    failures = []
+    if len(samples) < 2:
+        failures.append("session too short to compare samples; lower --warmup or raise --duration")
+    else:
+        first, last = samples[0], samples[-1]
+        rss_growth = last["rss_mb"] - first["rss_mb"]
+        traced_growth = last["traced_mb"] - first["traced_mb"]
+        # Median of the first vs last third of the windows, so one noisy window can't fail the run
+        k = max(1, len(samples) // 3)
+        early = statistics.median(s["p50_ms"] for s in samples[:k])
+        late = statistics.median(s["p50_ms"] for s in samples[-k:])
+        drift = late / early if early else 1.0
+        print(f"RSS growth {rss_growth:+.1f} MB, traced growth {traced_growth:+.2f} MB, median frame time drift x{drift:.2f}")
+        if rss_growth > args.max_rss_growth_mb:
+            failures.append(f"RSS grew {rss_growth:.1f} MB (budget {args.max_rss_growth_mb:g} MB)")
+        if traced_growth > args.max_traced_growth_mb:
+            failures.append(f"traced memory grew {traced_growth:.2f} MB (budget {args.max_traced_growth_mb:g} MB)")
+        if drift > args.max_latency_drift:
+            failures.append(f"median frame time went from {early:.2f} to {late:.2f} ms (budget x{args.max_latency_drift:g})")
+    
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        return 1
+    print("PASS")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Backend modules import each other by bare name, as the scripts do
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
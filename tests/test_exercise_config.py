@@ -0,0 +1,84 @@
+import pytest
+from exercise_config import ExerciseLibrary, compile_exercise
+
+VALID = {
+    "id": "1",
+    "name": "Squats",
+    "target_reps": 10,
+    "config_json": {
+        "down_angle": 90,
+        "up_angle": 160,
+        "keypoints": {"left": [23, 25, 27], "right": [24, 26, 28], "secondary": {"hip": [11, 23, 25]}},
+        "posture_rules": [{"error": "knee_not_aligned", "a": [25], "b": [26], "axis": "y", "compare": "abs>", "threshold": 0.12}],
+    },
+}
+
+def with_config(**config):
+    return {**VALID, "config_json": {**VALID["config_json"], **config}}
+
+def test_valid_exercise_compiles():
+    definition = compile_exercise(VALID)
+    assert definition.sides == ("left", "right")
+    assert definition.joint_names == ("left", "right", "hip")
+    assert (definition.down_angle, definition.up_angle, definition.target_reps) == (90.0, 160.0, 10)
+
+def test_record_must_be_an_object():
+    with pytest.raises(ValueError):
+        compile_exercise(["Squats"])
+
+def test_config_json_must_be_an_object():
+    with pytest.raises(ValueError):
+        compile_exercise({**VALID, "config_json": [90, 160]})
+
+def test_config_json_string_must_parse():
+    with pytest.raises(ValueError):
+        compile_exercise({**VALID, "config_json": "{not json"})
+
+@pytest.mark.parametrize("value", [True, "90", None, 0, 181, float("nan")])
+def test_down_angle_must_be_a_number_in_range(value):
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(down_angle=value))
+
+@pytest.mark.parametrize("value", [True, "160", None, -1, 200, float("inf")])
+def test_up_angle_must_be_a_number_in_range(value):
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(up_angle=value))
+
+def test_down_angle_must_be_below_up_angle():
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(down_angle=160, up_angle=90))
+
+@pytest.mark.parametrize("value", [True, 0, -3, 2.5, "10"])
+def test_target_reps_must_be_a_positive_integer(value):
+    with pytest.raises(ValueError):
+        compile_exercise({**VALID, "target_reps": value})
+
+def test_keypoints_must_be_an_object():
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(keypoints=[[23, 25, 27]]))
+
+@pytest.mark.parametrize("triplet", [[23, 25], [23, 25, 27, 29], [23, 25, True], [23, 25, 27.0], [23, 25, 33], "23,25,27"])
+def test_side_keypoints_must_be_index_triplets(triplet):
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(keypoints={"left": triplet}))
+
+def test_secondary_keypoints_must_be_an_object():
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(keypoints={"left": [23, 25, 27], "secondary": [[11, 23, 25]]}))
+
+def test_secondary_keypoints_must_be_index_triplets():
+    with pytest.raises(ValueError):
+        compile_exercise(with_config(keypoints={"left": [23, 25, 27], "secondary": {"hip": [11, False, 25]}}))
+
+@pytest.mark.parametrize("rules", [{"error": "x"}, [{"error": "x", "a": [1.5], "axis": "y", "compare": ">"}]])
+def test_posture_rules_errors_are_value_errors(rules):
+    with pytest.raises(ValueError, match="Invalid configuration for exercise 1"):
+        compile_exercise(with_config(posture_rules=rules))
+
+def test_library_reports_invalid_records_and_keeps_the_rest():
+    library = ExerciseLibrary()
+    library.load([VALID, {**with_config(up_angle=True), "id": "2"}, "not a record"])
+    assert list(library.definitions) == ["1"]
+    assert set(library.errors) == {"2", ""}
+    with pytest.raises(ValueError):
+        library.get("2")
@@ -0,0 +1,58 @@
+import pytest
+from exercise_config import ExerciseLibrary, compile_config
+from posture_rules import PostureRules
+
+VALID_RULE = {"error": "shoulders_uneven", "a": [11], "b": [12], "axis": "y", "compare": "abs>", "threshold": 0.1}
+
+@pytest.mark.parametrize("rules", [
+    {"error": "x"},
+    "shoulders_uneven",
+    None,
+])
+def test_rules_must_be_a_list(rules):
+    with pytest.raises(ValueError):
+        PostureRules(rules)
+
+@pytest.mark.parametrize("rule", [
+    "shoulders_uneven",
+    ["error", "a"],
+    {**VALID_RULE, "error": ""},
+    {**VALID_RULE, "error": 3},
+    {**VALID_RULE, "a": [1.5]},
+    {**VALID_RULE, "a": [True]},
+    {**VALID_RULE, "b": [False]},
+    {**VALID_RULE, "a": ["11"]},
+    {**VALID_RULE, "a": 11},
+    {**VALID_RULE, "b": 12},
+    {**VALID_RULE, "a": []},
+    {**VALID_RULE, "a": [33]},
+    {**VALID_RULE, "b": [-1]},
+    {**VALID_RULE, "axis": "z"},
+    {**VALID_RULE, "compare": ">="},
+    {**VALID_RULE, "threshold": "0.1"},
+    {**VALID_RULE, "threshold": True},
+    {**VALID_RULE, "threshold": float("nan")},
+])
+def test_malformed_rule_raises_value_error(rule):
+    with pytest.raises(ValueError):
+        PostureRules([rule])
+
+def test_malformed_rule_fails_exercise_compile_with_value_error():
+    with pytest.raises(ValueError, match="Invalid configuration"):
+        compile_config({"posture_rules": [{**VALID_RULE, "a": [1.5]}]})
+
+def test_library_skips_only_the_exercise_with_a_bad_rule():
+    library = ExerciseLibrary()
+    library.load([
+        {"id": "1", "name": "Good", "config_json": {"posture_rules": [VALID_RULE]}},
+        {"id": "2", "name": "Bad", "config_json": {"posture_rules": [{**VALID_RULE, "a": [True]}]}},
+    ])
+    assert list(library.definitions) == ["1"]
+    assert list(library.errors) == ["2"]
+
+def test_valid_rule_evaluates():
+    rules = PostureRules([VALID_RULE])
+    landmarks = [(0.5, 0.5, 1.0)] * 33
+    assert rules.evaluate(landmarks) == []
+    landmarks[11] = (0.5, 0.8, 1.0)
+    assert rules.evaluate(landmarks) == ["shoulders_uneven"]
@@ -0,0 +1,36 @@
+import numpy as np
+from exercise_config import compile_config
+from exercise_engine import ExerciseEngine
+from motion_synth import generate_motion
+from rescoring import rescore_chunk
+from session_timeline import SessionTimeline
+
+PUSH_UPS = {"down_angle": 90, "up_angle": 160, "keypoints": {"left": [11, 13, 15], "right": [12, 14, 16]}}
+
+def record_session(definition, motion):
+    """Run a stream through the engine as PoseSession does; (engine rep count, timeline blob)"""
+    engine = ExerciseEngine(definition)
+    timeline = SessionTimeline()
+    metrics = None
+    for landmarks, timestamp in zip(motion.landmark_lists(), motion.timestamps.tolist()):
+        metrics, posture_errors = engine.process_landmarks(landmarks, timestamp)
+        timeline.append(timestamp, metrics, posture_errors)
+    return metrics["reps"], timeline.encode()
+
+def test_rescoring_at_unchanged_thresholds_matches_the_engine(tmp_path):
+    definition = compile_config(PUSH_UPS)
+    counted = {}
+    for seed in range(24):
+        # Peaks and troughs within noise of the thresholds, with the sides out of step
+        motion = generate_motion(definition, reps=8, tempo=1.5, hold=0.2, low_angle=89.5, high_angle=160.5,
+                                 asymmetry=0.4, noise=0.001, rom_decay=0.01, seed=seed)
+        counted[str(seed)], blob = record_session(definition, motion)
+        (tmp_path / f"{seed}.bin").write_bytes(blob)
+    
+    rescored = rescore_chunk(str(tmp_path), list(counted), definition.down_angle, definition.up_angle,
+                             sides=len(definition.sides))
+    
+    assert {session_id: result["reps"] for session_id, result in rescored.items()} == counted
+    assert not any(result["approximate"] for result in rescored.values())
+    # Near-threshold streams: the engine must not be scoring every rep or none
+    assert 0 < np.mean(list(counted.values())) < 8
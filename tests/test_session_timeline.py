@@ -0,0 +1,16 @@
+from session_timeline import SessionTimeline, decode_timeline
+
+def test_posture_errors_past_the_flag_mask_are_reported(capsys):
+    timeline = SessionTimeline()
+    errors = [f"error_{i}" for i in range(33)]
+    timeline.append(0.0, {"reps": 0}, errors)
+    timeline.append(0.05, {"reps": 0}, errors)
+    
+    assert timeline.posture_errors == errors[:31]
+    assert timeline.dropped_errors == {"error_31", "error_32"}
+    # Logged once per name, not per frame
+    assert capsys.readouterr().out.count("not recording") == 2
+    
+    points, names = decode_timeline(timeline.encode())
+    assert names == errors[:31]
+    assert points["flags"][0] == (1 << 31) - 1